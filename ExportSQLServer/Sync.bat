@@ -1,29 +1,56 @@
-@echo off
-echo ============================================
-echo 🚀 Starting Python Scripts Execution
-echo ============================================
-
-set "PYTHON_EXE=C:\Program Files\Python313\python.exe"
-set "SCRIPT_DIR=D:\Projects\Python\ExportSQLServer"
-
-cd /d "%SCRIPT_DIR%"
-
-set FILES=01exportGLAccount1.py 02exportGLAccount2.py 03exportbanks.py 04exportCustomers.py 05exportSuppliers.py 06exportboatsstatus.py 07exportboats.py 09exportstores.py 10exportitems.py 11exportsales.py 12exportsaleitems.py 13exportopeningbalanes.py 14exportGLTrans.py 15exportcheques.py 16exporttransferes.py 17exporttransferdetails.py 18exportpurchase.py 19exportpurchasedetail.py 20exportbillprefix.py synctime.py
-
-for %%f in (%FILES%) do (
-    echo --------------------------------------------
-    echo ▶️ Running %%f ...
-    "%PYTHON_EXE%" "%%f"
-    if errorlevel 1 (
-        echo ❌ Error in %%f. Stopping execution.
-        pause
-        exit /b 1
-    )
-    echo ✅ Finished %%f successfully.
-    
-)
-
-echo ============================================
-echo 🎉 All Python scripts executed successfully!
-echo ============================================
-pause
+@echo off
+echo ============================================
+echo 🚀 Starting SQL Server to Supabase Sync
+echo ============================================
+
+REM Pass --incremental to sync only rows changed since the last successful run
+REM (high-water marks are kept in Supabase tblsynctablelogs). Default is a full reload.
+REM Table names can be given to sync just those, e.g. Sync.bat tblsales tblsalesdetail
+REM --staged loads full reloads into <table>_staging and swaps them in at the end,
+REM so the app never reads a half-loaded table (needs supabase_sync_schema.sql).
+REM Staged loads and incremental delete checks call functions only the service_role
+REM may run: set SUPABASE_KEY to the project's service_role key (keep it off the app).
+REM --jobs N caps how many tables sync at the same time (default 4).
+REM --read-parallelism N reads the ledger and sales detail as N key ranges at once
+REM on full reloads (default 4); use 1 to go easy on SQL Server.
+REM --copy TABLE loads that table with PostgreSQL COPY instead of REST; set
+REM SUPABASE_DB_URL to the database connection string and pip install "psycopg[binary]".
+REM A table interrupted mid-sync (reboot, lost network) continues from its checkpoint
+REM in state\checkpoints on the next run instead of being truncated and reloaded.
+REM --cache writes extracted batches to state\cache\<table> and uploads from there;
+REM if the upload dies, the next --cache run finishes it without re-reading SQL Server.
+REM --from-cache uploads the cached snapshots again (e.g. to another project).
+REM set SYNC_PAYLOAD_FORMAT=csv sends CSV bodies instead of JSON (about a third of the
+REM bytes); SYNC_PAYLOAD_ENCODING=gzip compresses them if the gateway inflates requests.
+REM Every run ends by calling sync_refresh_touched with just the account codes, customers and
+REM boats whose balances changed, which rebuilds their rows of tblsync_customer_boat_balances.
+REM set SYNC_REFRESH_FUNCTION names another function; set it empty to skip the refresh.
+REM Incremental runs read every table up to the same moment (SQL Server's clock at the start
+REM of the run) and the next incremental run starts exactly there. Full reloads read each table
+REM as it is when its turn comes, so tables can disagree on rows changed during the run until
+REM the next --incremental run picks those rows up. set SYNC_SNAPSHOT_ISOLATION=1 also
+REM reads each key range in one SNAPSHOT transaction (ALLOW_SNAPSHOT_ISOLATION must be ON).
+REM Incremental runs delete rows removed in SQL Server from the ledger, cheques, sales,
+REM transfers and purchases: from change tracking where it is enabled on the table, else
+REM by comparing key sets every SYNC_KEY_CHECK_HOURS (default 24; state\deletions.json).
+REM A comparison that fails is retried after SYNC_KEY_CHECK_RETRY_MINUTES (default 60).
+REM set SYNC_STATE_DIR / SYNC_SPOOL_DIR / SYNC_LOG_DIR to keep the state, spool and logs
+REM folders elsewhere.
+REM For a resident service that syncs on a schedule instead, see install_sync_service.bat.
+
+set "PYTHON_EXE=C:\Program Files\Python313\python.exe"
+set "SCRIPT_DIR=D:\Projects\Python\ExportSQLServer"
+
+cd /d "%SCRIPT_DIR%"
+
+"%PYTHON_EXE%" sync.py %*
+if errorlevel 1 (
+    echo ❌ Sync failed. See the output above.
+    pause
+    exit /b 1
+)
+
+echo ============================================
+echo 🎉 All tables synced successfully!
+echo ============================================
+pause
@@ -0,0 +1,285 @@
+# aggregates.py
+"""Balance summaries computed while tblgeneralledger and tblsales stream through the sync.
+
+The app's balance reports aggregate the whole ledger on every request. The
+sync already sees every row it uploads, so it keeps the totals itself and
+upserts them into small summary tables (see supabase_sync_schema.sql):
+
+    tblsync_account_balances      per AccountCode: debit, credit, balance, entries
+    tblsync_boat_balances         per AccountCode and BoatID_FK
+    tblsync_customer_sales        per CustomerID_FK: active bills and their amount
+    tblsync_customer_boat_sales   per CustomerID_FK and BoatID_FK
+
+Like the synced tables they cover rows after the master closing date. Each
+row's contribution is remembered in state/aggregates/<summary>.sqlite, so incremental
+runs move a changed row's amounts from its old group to its new one instead
+of re-reading the table. Only groups whose totals changed are sent, and a
+group that failed to upload stays pending until a later run gets it through.
+
+An incremental run only loads the totals of the groups its rows touch, so the
+work after the upload grows with the change set, not with the ledger. The
+AccountCode / CustomerID_FK / BoatID_FK values of the changed groups are
+collected in TouchedKeys, and the run ends by calling the Postgres function
+SYNC_REFRESH_FUNCTION with just those keys. The default, sync_refresh_touched,
+rebuilds the rows of tblsync_customer_boat_balances for the touched customers
+only, instead of refreshing a whole materialized view; set it to "" to skip.
+"""
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+
+from batching import encode_row, json_body
+from paths import STATE_DIR
+from uploader import UploadError, post_rows
+
+AGGREGATES_DIR = os.path.join(STATE_DIR, "aggregates")
+UPLOAD_CHUNK = 1000       # summary rows per request
+LOOKUP_CHUNK = 500        # keys per contribution lookup
+# Called as fn(account_codes text[], customer_ids integer[], boat_ids integer[]) after a run; "" = none.
+REFRESH_FUNCTION = os.environ.get("SYNC_REFRESH_FUNCTION", "sync_refresh_touched")
+
+
+@dataclass(frozen=True)
+class Aggregate:
+    target: str                  # Supabase summary table
+    source: str                  # synced table feeding it (TableSpec.target)
+    group_by: tuple              # record fields of the summary key; rows with a NULL one are left out
+    sums: dict                   # summary column -> record fields added up, "-field" subtracts
+    only_if: str = None          # record field that must be truthy for the row to count
+
+    @property
+    def columns(self):
+        return tuple(self.sums) + ("entries",)
+
+
+LEDGER_SUMS = {"debit": ("debit",), "credit": ("credit",), "balance": ("debit", "-credit")}
+SALES_SUMS = {"bill_amount": ("accountcode1amount", "accountcode2amount")}
+
+AGGREGATES = [
+    Aggregate("tblsync_account_balances", "tblgeneralledger", ("accountcode",), LEDGER_SUMS),
+    Aggregate("tblsync_boat_balances", "tblgeneralledger", ("accountcode", "boatid_fk"), LEDGER_SUMS),
+    Aggregate("tblsync_customer_sales", "tblsales", ("customerid_fk",), SALES_SUMS, only_if="active"),
+    Aggregate("tblsync_customer_boat_sales", "tblsales", ("customerid_fk", "boatid_fk"), SALES_SUMS,
+              only_if="active"),
+]
+
+
+def aggregates_for(source):
+    return [aggregate for aggregate in AGGREGATES if aggregate.source == source]
+
+
+def needs_rebuild(source, directory=AGGREGATES_DIR):
+    """Whether a summary fed by source was left dirty by a resumed run; only a full reload rebuilds it."""
+    for aggregate in aggregates_for(source):
+        path = os.path.join(directory, f"{aggregate.target}.sqlite")
+        if not os.path.exists(path):
+            continue
+        conn = sqlite3.connect(path)
+        try:
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'flags'").fetchone() and \
+                    conn.execute("SELECT 1 FROM flags WHERE name = 'dirty'").fetchone():
+                return True
+        finally:
+            conn.close()
+    return False
+
+
+def _add(totals, group, values, sign):
+    current = totals.setdefault(group, [0.0] * len(values))
+    for i, value in enumerate(values):
+        current[i] += sign * value
+
+
+def _rounded(values):
+    return [round(value, 4) for value in values]
+
+
+class TouchedKeys:
+    """The AccountCode / CustomerID_FK / BoatID_FK values whose summary totals a run changed."""
+
+    FIELDS = {"accountcode": "account_codes", "customerid_fk": "customer_ids", "boatid_fk": "boat_ids"}
+
+    def __init__(self):
+        self.values = {field: set() for field in self.FIELDS}
+        self.lock = threading.Lock()     # summaries of tables syncing side by side add at once
+
+    def add(self, group_by, groups):
+        with self.lock:
+            for grp in groups:
+                for field, value in zip(group_by, json.loads(grp)):
+                    if field in self.values:
+                        self.values[field].add(value)
+
+    def __bool__(self):
+        return any(self.values.values())
+
+    def __str__(self):
+        return ", ".join(f"{len(self.values[field])} {name}"
+                         for field, name in self.FIELDS.items() if self.values[field])
+
+    def params(self):
+        """Arguments of the SYNC_REFRESH_FUNCTION call."""
+        return {name: sorted(self.values[field]) for field, name in self.FIELDS.items()}
+
+
+class Summary:
+    """The totals of one Aggregate, moved along by the rows of one table sync.
+
+    scan() the source chunks, then commit() the new totals locally and push()
+    the groups Supabase does not have yet. With replace=True (a full reload)
+    the totals are rebuilt from the scanned rows alone. The groups commit()
+    changed are added to touched (a TouchedKeys), if given.
+
+    The contributions of an interrupted run are rolled back, so a run that
+    resumes it (resumed=True) leaves out the rows uploaded before the
+    interruption. Its commit() marks the summary dirty, and the next run of
+    the source table is a full reload that rebuilds it (see needs_rebuild()).
+    """
+
+    def __init__(self, aggregate, key, replace=False, directory=AGGREGATES_DIR, touched=None, resumed=False):
+        self.aggregate = aggregate
+        self.key = key
+        self.replace = replace
+        self.resumed = resumed
+        self.touched = touched
+        os.makedirs(directory, exist_ok=True)
+        # One file per summary, so the summaries of tables syncing side by side never wait on each
+        # other. Fed from the prefetch thread, committed from the table's thread; never both at once.
+        self.conn = sqlite3.connect(os.path.join(directory, f"{aggregate.target}.sqlite"), check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS contributions ("
+                          "pk PRIMARY KEY, grp TEXT NOT NULL, vals TEXT NOT NULL) WITHOUT ROWID")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS totals ("
+                          "grp TEXT PRIMARY KEY, vals TEXT NOT NULL, sent TEXT) WITHOUT ROWID")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS flags (name TEXT PRIMARY KEY) WITHOUT ROWID")
+        self.conn.commit()
+        self.dirty = self.conn.execute("SELECT 1 FROM flags WHERE name = 'dirty'").fetchone() is not None
+        if self.dirty and not replace:
+            print(f"⚠️ {aggregate.target}: totals miss rows of an interrupted run; the next run of "
+                  f"{aggregate.source} reloads it fully to rebuild them")
+        # stored: the totals before this run, totals: the running ones. Incremental runs load only
+        # the groups their rows touch; a rebuild needs every stored group to zero the vanished ones.
+        self.stored = {}
+        self.totals = {}
+        if replace:
+            self.stored = {grp: json.loads(vals) for grp, vals in self.conn.execute("SELECT grp, vals FROM totals")}
+            self.conn.execute("DELETE FROM contributions")
+
+    def contribution(self, record):
+        """(group, [sums..., 1]) of one source record, or None if it does not count."""
+        aggregate = self.aggregate
+        if aggregate.only_if and not record.get(aggregate.only_if):
+            return None
+        group = [record.get(field) for field in aggregate.group_by]
+        if None in group:
+            return None
+        values = []
+        for fields in aggregate.sums.values():
+            total = 0.0
+            for field in fields:
+                value = record.get(field.lstrip("-")) or 0.0
+                total += -value if field.startswith("-") else value
+            values.append(total)
+        return json.dumps(group, default=str), values + [1]
+
+    def _previous(self, keys):
+        previous = {}
+        for i in range(0, len(keys), LOOKUP_CHUNK):
+            chunk = keys[i:i + LOOKUP_CHUNK]
+            rows = self.conn.execute(
+                f"SELECT pk, grp, vals FROM contributions WHERE pk IN ({','.join('?' * len(chunk))})", chunk)
+            previous.update((pk, (grp, json.loads(vals))) for pk, grp, vals in rows)
+        return previous
+
+    def _load(self, groups):
+        """Start the running totals of groups not seen yet this run from their stored totals."""
+        groups = [grp for grp in set(groups) if grp not in self.totals]
+        for i in range(0, len(groups), LOOKUP_CHUNK):
+            chunk = groups[i:i + LOOKUP_CHUNK]
+            rows = self.conn.execute(
+                f"SELECT grp, vals FROM totals WHERE grp IN ({','.join('?' * len(chunk))})", chunk)
+            self.stored.update((grp, json.loads(vals)) for grp, vals in rows)
+        for grp in groups:
+            if grp in self.stored:
+                self.totals[grp] = list(self.stored[grp])
+
+    def apply(self, records):
+        """Move the totals by the new contribution of each record, less its previous one."""
+        new = {record[self.key]: self.contribution(record) for record in records}
+        if not self.replace:
+            previous = self._previous(list(new)).values()
+            self._load([group for group, _ in previous]
+                       + [contribution[0] for contribution in new.values() if contribution])
+            for group, values in previous:
+                _add(self.totals, group, values, -1)
+        for contribution in new.values():
+            if contribution:
+                _add(self.totals, *contribution, 1)
+        self.conn.executemany("INSERT OR REPLACE INTO contributions (pk, grp, vals) VALUES (?, ?, ?)",
+                              ((pk, contribution[0], json.dumps(contribution[1]))
+                               for pk, contribution in new.items() if contribution))
+        if not self.replace:
+            self.conn.executemany("DELETE FROM contributions WHERE pk = ?",
+                                  ((pk,) for pk, contribution in new.items() if not contribution))
+
+    def remove(self, keys):
+        """Take the rows of keys, deleted from the source, out of the totals."""
+        previous = self._previous(list(keys))
+        self._load([group for group, _ in previous.values()])
+        for group, values in previous.values():
+            _add(self.totals, group, values, -1)
+        self.conn.executemany("DELETE FROM contributions WHERE pk = ?", ((pk,) for pk in previous))
+
+    def scan(self, chunks):
+        """Pass (records, newest) chunks through, applying their records."""
+        for records, newest in chunks:
+            self.apply(records)
+            yield records, newest
+
+    def commit(self):
+        """Store the contributions and the changed totals; groups that lost every row go to zero."""
+        zero = [0.0] * len(self.aggregate.columns)
+        changed = [(grp, self.totals.get(grp, zero)) for grp in set(self.stored) | set(self.totals)
+                   if _rounded(self.totals.get(grp, zero)) != _rounded(self.stored.get(grp, zero))]
+        for grp, values in changed:
+            self.conn.execute("INSERT INTO totals (grp, vals) VALUES (?, ?) "
+                              "ON CONFLICT (grp) DO UPDATE SET vals = excluded.vals", (grp, json.dumps(values)))
+        if self.replace:
+            self.conn.execute("DELETE FROM flags WHERE name = 'dirty'")
+        elif self.resumed:
+            self.conn.execute("INSERT OR IGNORE INTO flags (name) VALUES ('dirty')")
+        self.conn.commit()
+        self.dirty = not self.replace and (self.dirty or self.resumed)
+        self.stored = {grp: list(values) for grp, values in self.totals.items()}
+        if self.touched is not None:
+            self.touched.add(self.aggregate.group_by, [grp for grp, _ in changed])
+        return len(changed)
+
+    def pending(self):
+        """Summary records for the groups whose totals Supabase does not have yet."""
+        records = []
+        for grp, vals in self.conn.execute("SELECT grp, vals FROM totals WHERE sent IS NOT vals"):
+            values = json.loads(vals)
+            record = dict(zip(self.aggregate.group_by, json.loads(grp)))
+            record.update(zip(self.aggregate.sums, (round(value, 2) for value in values)))
+            record["entries"] = int(round(values[-1]))
+            records.append((grp, record))
+        return records
+
+    def push(self, session):
+        """Upsert the pending summary rows; returns how many were sent. Failures stay pending."""
+        aggregate = self.aggregate
+        pending = self.pending()
+        for i in range(0, len(pending), UPLOAD_CHUNK):
+            chunk = pending[i:i + UPLOAD_CHUNK]
+            response = post_rows(session, aggregate.target, json_body([encode_row(record) for _, record in chunk]),
+                                 on_conflict=",".join(aggregate.group_by))
+            if response.is_error:
+                raise UploadError(response.status_code, response.text[:500])
+            with self.conn:
+                self.conn.executemany("UPDATE totals SET sent = vals WHERE grp = ?", ((grp,) for grp, _ in chunk))
+        return len(pending)
+
+    def close(self):
+        self.conn.close()     # uncommitted contributions of a failed run are rolled back
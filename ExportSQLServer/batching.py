@@ -0,0 +1,68 @@
+# batching.py
+"""Size upload batches by serialized JSON bytes instead of a fixed row count.
+
+A ledger row with 23 columns is several times larger than a sales detail row,
+so a fixed row count is either too small for narrow tables or risks the
+request size limit for wide ones. Rows are serialized once as they stream in
+and cut into batches of roughly BatchSizer.target_bytes; the target then
+follows the observed latency and shrinks when Supabase rejects a payload.
+"""
+import json
+import threading
+import time
+
+DEFAULT_TARGET_BYTES = 2 * 1024 * 1024
+MIN_TARGET_BYTES = 32 * 1024
+MAX_TARGET_BYTES = 16 * 1024 * 1024
+TARGET_LATENCY_SECONDS = 2.0
+
+
+class BatchSizer:
+    """Payload size target for one table, tuned from upload latency and rejections."""
+
+    def __init__(self, target_bytes=DEFAULT_TARGET_BYTES, target_latency=TARGET_LATENCY_SECONDS):
+        self.target_bytes = target_bytes
+        self.target_latency = target_latency
+        self.lock = threading.Lock()
+
+    def record(self, nbytes, latency):
+        """Grow the target after quick full-size uploads, shrink it after slow ones."""
+        with self.lock:
+            if latency > self.target_latency * 1.5:
+                self.target_bytes = max(MIN_TARGET_BYTES, int(self.target_bytes * 0.75))
+            elif latency < self.target_latency / 2 and nbytes >= self.target_bytes * 0.9:
+                self.target_bytes = min(MAX_TARGET_BYTES, int(self.target_bytes * 1.25))
+
+    def rejected(self, nbytes):
+        """A payload of nbytes was refused as too large (HTTP 413)."""
+        with self.lock:
+            self.target_bytes = max(MIN_TARGET_BYTES, min(self.target_bytes, nbytes) // 2)
+
+
+def encode_row(record):
+    # ensure_ascii keeps len() equal to the encoded byte count
+    return json.dumps(record, default=str, separators=(",", ":"))
+
+
+def json_body(parts):
+    return "[" + ",".join(parts) + "]"
+
+
+def byte_batches(chunks, sizer, metrics=None):
+    """Regroup (records, newest change) chunks into (encoded rows, newest change) batches."""
+    parts, size, newest = [], 2, None
+    for records, chunk_newest in chunks:
+        start = time.perf_counter()
+        encoded = [encode_row(record) for record in records]
+        if metrics:
+            metrics.add(encode_seconds=time.perf_counter() - start)
+        for part in encoded:
+            if parts and size + len(part) + 1 > sizer.target_bytes:
+                yield parts, newest
+                parts, size, newest = [], 2, None
+            parts.append(part)
+            size += len(part) + 1
+        if chunk_newest and (newest is None or chunk_newest > newest):
+            newest = chunk_newest
+    if parts:
+        yield parts, newest
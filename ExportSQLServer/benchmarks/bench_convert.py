@@ -0,0 +1,86 @@
+# bench_convert.py
+"""Row-to-dict conversion: the old per-row loop against converters.make_converter().
+
+Builds synthetic tblGeneralLedger rows shaped like pyodbc output (Decimals,
+datetimes, NULLs) and converts them in fetchmany()-sized chunks both ways.
+
+    python benchmarks/bench_convert.py            # 1,000,000 rows
+    python benchmarks/bench_convert.py 200000
+"""
+import datetime
+import decimal
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from converters import iso_date, make_converter  # noqa: E402
+from sync_engine import FETCH_SIZE  # noqa: E402
+from table_specs import SPECS_BY_TARGET  # noqa: E402
+
+SPEC = SPECS_BY_TARGET["tblgeneralledger"]
+OLD_COERCE = {"TransactionDate": iso_date, "ChequeDate": iso_date,
+              "CreatedDate": iso_date, "EditDate": iso_date, **SPEC.coerce}
+
+
+def synthetic_rows(count):
+    base = datetime.datetime(2024, 1, 1)
+    for i in range(1, count + 1):
+        when = base + datetime.timedelta(minutes=i)
+        yield (i, f"01-02-{i % 900:04d}", decimal.Decimal(i % 5000) / 4, None, f"Narration {i}",
+               f"JV-{i}", when, None, False, None, None, None, False, None, None, None, None,
+               "admin", when, None, None, False, i % 700, when)
+
+
+def description():
+    """cursor.description as pyodbc reports it for the ledger query."""
+    dates = {"TransactionDate", "ChequeDate", "CreatedDate", "EditDate", "SyncChangeDate"}
+    names = SPEC.columns + ("SyncChangeDate",)
+    return [(name, datetime.datetime if name in dates else decimal.Decimal if name in ("Debit", "Credit") else str,
+             None, None, None, None, True) for name in names]
+
+
+def per_row(chunk):
+    """The conversion sync_engine did before converters.py."""
+    records = []
+    for row in chunk:
+        record = {}
+        for i, column in enumerate(SPEC.columns):
+            value = row[i]
+            coerce = OLD_COERCE.get(column)
+            record[column.lower()] = coerce(value) if coerce else value
+        records.append(record)
+    return records
+
+
+def chunks(rows, size=FETCH_SIZE):
+    return [rows[i:i + size] for i in range(0, len(rows), size)]
+
+
+def timed(label, convert, batches, total):
+    start = time.perf_counter()
+    out = [convert(chunk) for chunk in batches]
+    elapsed = time.perf_counter() - start
+    print(f"⏱️ {label:<12} {elapsed:7.2f}s  {total / elapsed:>12,.0f} rows/s")
+    return out, elapsed
+
+
+def main(argv):
+    count = int(argv[0]) if argv else 1_000_000
+    print(f"📦 Building {count:,} synthetic tblGeneralLedger rows ...")
+    rows = list(synthetic_rows(count))
+    batches = chunks(rows)
+    columnar = make_converter(description(), len(SPEC.columns), SPEC.coerce)
+
+    old, old_time = timed("per-row", per_row, batches, count)
+    new, new_time = timed("columnar", columnar, batches, count)
+    if old != new:
+        print("❌ Converters disagree")
+        return 1
+    print(f"✅ Same output, {old_time / new_time:.2f}x faster")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
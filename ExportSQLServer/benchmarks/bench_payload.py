@@ -0,0 +1,49 @@
+# bench_payload.py
+"""Upload body size and encoding cost: plain JSON (today) against CSV and gzip.
+
+Converts synthetic tblGeneralLedger rows the way the sync does, cuts them into
+byte-sized batches and builds every batch body in each format, reporting the
+bytes that would go over the wire and the CPU time spent building them.
+
+    python benchmarks/bench_payload.py            # 200,000 rows
+    python benchmarks/bench_payload.py 1000000
+
+To measure a whole sync with another format, run bench_sync.py with
+SYNC_PAYLOAD_FORMAT=csv (PostgREST in the stand-in does not inflate gzip).
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from batching import BatchSizer, byte_batches  # noqa: E402
+from bench_convert import SPEC, chunks, description, synthetic_rows  # noqa: E402
+from converters import make_converter  # noqa: E402
+from payloads import encode_payload  # noqa: E402
+
+VARIANTS = [("json", ""), ("json", "gzip"), ("csv", ""), ("csv", "gzip")]
+
+
+def main(argv):
+    count = int(argv[0]) if argv else 200_000
+    print(f"📦 Building {count:,} synthetic tblGeneralLedger rows ...")
+    convert = make_converter(description(), len(SPEC.columns), SPEC.coerce)
+    records = ((convert(chunk), None) for chunk in chunks(list(synthetic_rows(count))))
+    batches = [parts for parts, _ in byte_batches(records, BatchSizer())]
+    print(f"📦 {len(batches)} batches")
+
+    baseline = None
+    for payload_format, encoding in VARIANTS:
+        start = time.perf_counter()
+        size = sum(len(encode_payload(parts, payload_format, encoding)[0]) for parts in batches)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or size
+        label = payload_format + ("+" + encoding if encoding else "")
+        print(f"⏱️ {label:<10} {size / 1024 / 1024:9.1f} MB  {size / baseline:6.1%} of JSON  "
+              f"{elapsed:6.2f}s to build  {count / elapsed:>12,.0f} rows/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,163 @@
+# checkpoints.py
+"""Resumable progress of a table sync, so a restarted run continues where the last one stopped.
+
+Rows are read in primary-key order per key range and uploaded in numbered
+batches that finish out of order. A Checkpoint keeps, for every key range,
+the last key up to which every row has been acknowledged by Supabase, plus
+the number of batches acknowledged without a gap. It is written to
+state/checkpoints/<table>.json after each batch that moves it forward and
+logged to tblsynctablelogs (status 'checkpoint') every SAVE_EVERY_SECONDS,
+so it also survives a lost state directory. A run that gets to the end
+deletes it.
+
+A restarted run picks the checkpoint up instead of truncating: every range
+is read again from its checkpoint key, and rows are upserted so the few that
+were sent but not acknowledged before the interruption are just overwritten.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from paths import STATE_DIR
+from sync_state import get_table_checkpoint, log_table_checkpoint
+
+CHECKPOINT_DIR = os.path.join(STATE_DIR, "checkpoints")
+SAVE_EVERY_SECONDS = 60   # how often progress is also logged to tblsynctablelogs
+
+
+def _dump_time(value):
+    return value.isoformat() if value else None
+
+
+def _load_time(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def clear_checkpoint(table_name, directory=CHECKPOINT_DIR):
+    """Forget the local checkpoint of a table; the next run starts from scratch."""
+    try:
+        os.remove(os.path.join(directory, f"{table_name}.json"))
+    except FileNotFoundError:
+        pass
+
+
+class Checkpoint:
+    """How far one table run got; feed it the read chunks and the batches, and ack() each delivered batch."""
+
+    def __init__(self, table_name, key, mode, since, load_into, ranges, supabase=None, directory=CHECKPOINT_DIR,
+                 batch=0, rows=0, newest=None, boundary=None):
+        self.table_name = table_name
+        self.key = key                     # record field of the primary key (spec.target_key)
+        self.mode = mode
+        self.since = since
+        self.boundary = boundary           # change time the interrupted run read up to
+        self.load_into = load_into
+        self.ranges = [list(bounds) for bounds in ranges]   # [after_key, until_key], after_key moves forward
+        self.uppers = [until for _, until in self.ranges[:-1]]
+        self.supabase = supabase
+        self.path = os.path.join(directory, f"{table_name}.json")
+        self.batch = batch                 # batches acknowledged without a gap
+        self.rows = rows                   # rows in those batches, earlier runs included
+        self.newest = newest
+        self.read_rows = 0                 # rows read by this run
+        self.acked_rows = 0                # rows of this run in acknowledged batches
+        self.chunks = deque()              # (read_rows at chunk end, range index, last key)
+        self.batch_rows = {}               # batch number -> (rows, newest change)
+        self.done = set()                  # acknowledged batches beyond the gap
+        self.saved_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, table_name, key, supabase=None, directory=CHECKPOINT_DIR):
+        """The checkpoint an interrupted run left, from disk or else from tblsynctablelogs; None if there is none."""
+        path = os.path.join(directory, f"{table_name}.json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = get_table_checkpoint(supabase, table_name) if supabase is not None else None
+        if not state:
+            return None
+        return cls(table_name, key, state["mode"], _load_time(state["since"]), state["load_into"], state["ranges"],
+                   supabase, directory, state["batch"], state["rows"], _load_time(state["newest"]),
+                   _load_time(state.get("boundary")))
+
+    @property
+    def open_ranges(self):
+        """The (after_key, until_key) ranges still to read."""
+        return [tuple(bounds) for bounds in self.ranges
+                if bounds[0] is None or bounds[1] is None or bounds[0] < bounds[1]]
+
+    def state(self):
+        return {
+            "table": self.table_name,
+            "mode": self.mode,
+            "since": _dump_time(self.since),
+            "boundary": _dump_time(self.boundary),
+            "load_into": self.load_into,
+            "ranges": self.ranges,
+            "batch": self.batch,
+            "rows": self.rows,
+            "newest": _dump_time(self.newest),
+            "updated": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def track_chunks(self, chunks):
+        """Pass (records, newest) chunks through, noting where each one ends and which range it came from."""
+        for records, newest in chunks:
+            if records:
+                last = records[-1][self.key]
+                with self.lock:
+                    self.read_rows += len(records)
+                    self.chunks.append((self.read_rows, bisect.bisect_left(self.uppers, last), last))
+            yield records, newest
+
+    def track_batches(self, batches):
+        """Pass (number, parts, newest) batches through, noting their sizes."""
+        for number, parts, newest in batches:
+            with self.lock:
+                self.batch_rows[number] = (len(parts), newest)
+            yield number, parts, newest
+
+    def ack(self, number):
+        """Batch number reached Supabase (or the spool); move the checkpoint past every gapless batch."""
+        with self.lock:
+            self.done.add(number)
+            if self.batch + 1 not in self.done:
+                return
+            while self.batch + 1 in self.done:
+                self.batch += 1
+                self.done.discard(self.batch)
+                rows, newest = self.batch_rows.pop(self.batch)
+                self.acked_rows += rows
+                self.rows += rows
+                if newest and (self.newest is None or newest > self.newest):
+                    self.newest = newest
+            while self.chunks and self.chunks[0][0] <= self.acked_rows:
+                _, index, last = self.chunks.popleft()
+                self.ranges[index][0] = last
+            state = self.state()
+            self._write(state)
+            remote = self.supabase is not None and time.monotonic() - self.saved_at >= SAVE_EVERY_SECONDS
+            if remote:
+                self.saved_at = time.monotonic()
+        if remote:
+            log_table_checkpoint(self.supabase, self.table_name, state)
+
+    def _write(self, state):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(state, f, default=str)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"⚠️ {self.table_name}: could not write checkpoint: {e}")
+
+    def clear(self):
+        """The run finished; the next one starts from scratch."""
+        clear_checkpoint(self.table_name, os.path.dirname(self.path))
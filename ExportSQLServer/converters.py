@@ -0,0 +1,68 @@
+# converters.py
+"""Column-wise conversion of pyodbc result chunks into Supabase-ready dicts.
+
+make_converter() looks at cursor.description once per result set: it derives
+the lowercase Supabase names and picks one coercer per column (dates to ISO
+strings, Decimal to float, binary to hex). Each fetchmany() chunk is then
+transposed, every coerced column is mapped in one pass, and the rows are
+zipped back into dicts - no per-cell name lookups or type checks.
+"""
+import datetime
+import decimal
+
+
+def iso_date(value):
+    """datetime -> ISO string, NULL stays NULL."""
+    return value.isoformat() if value else None
+
+
+def money(value):
+    """Decimal amount -> float, NULL becomes 0."""
+    return float(value) if value is not None else 0.0
+
+
+def to_float(value):
+    return float(value) if value is not None else None
+
+
+def to_hex(value):
+    return bytes(value).hex() if value is not None else None
+
+
+def coercer_for(type_code):
+    """Default coercer for a pyodbc description type code (None when the value can go as-is)."""
+    if type_code in (datetime.datetime, datetime.date, datetime.time):
+        return iso_date
+    if type_code is decimal.Decimal:
+        return to_float
+    if type_code in (bytes, bytearray):
+        return to_hex
+    return None
+
+
+def make_converter(description, width=None, overrides=None):
+    """Return convert(rows) -> list of dicts for the first `width` columns of a result set.
+
+    overrides maps source column names (any case) to coercers that replace the
+    type-based default, e.g. money() where NULL must become 0.
+    """
+    columns = description[:width] if width is not None else description
+    overrides = {name.lower(): coerce for name, coerce in (overrides or {}).items()}
+    names = [column[0].lower() for column in columns]
+    coerced = [
+        (i, overrides.get(name) or coercer_for(column[1]))
+        for i, (name, column) in enumerate(zip(names, columns))
+    ]
+    coerced = [(i, coerce) for i, coerce in coerced if coerce]
+
+    def convert(rows):
+        if not rows:
+            return []
+        if not coerced:
+            return [dict(zip(names, row)) for row in rows]
+        by_column = list(zip(*rows))
+        for i, coerce in coerced:
+            by_column[i] = map(coerce, by_column[i])
+        return [dict(zip(names, values)) for values in zip(*by_column)]
+
+    return convert
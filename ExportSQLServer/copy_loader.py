@@ -0,0 +1,59 @@
+# copy_loader.py
+"""Load a table with PostgreSQL COPY over a direct database connection.
+
+Rows are streamed from the converted chunks straight into COPY ... FROM STDIN
+(text format), so a ledger reload is one long write instead of hundreds of
+JSON requests. The column mapping is the same as the REST uploader: spec
+columns lowercased.
+
+Everything happens in one transaction: a full reload empties the table with
+DELETE and refills it, so readers keep seeing the old rows until the commit,
+and an incremental run COPYs into a temp table and upserts from it on the
+primary key. A failure rolls the whole table back and is reported like any
+other table failure. (TRUNCATE would be faster, but its ACCESS EXCLUSIVE lock
+blocks every reader of the table until the COPY commits; the dead rows DELETE
+leaves behind are cleaned up by autovacuum.)
+"""
+import time
+
+from uploader import UploadResult
+
+PROGRESS_EVERY_SECONDS = 10   # between progress lines of one table
+
+
+def copy_rows(pg, spec, chunks, truncate=False):
+    """COPY (records, newest change) chunks into spec.target; returns an UploadResult.
+
+    truncate=True replaces every row of the table, otherwise the rows are upserted.
+    """
+    columns = [column.lower() for column in spec.columns]
+    column_list = ", ".join(columns)
+    load_into = spec.target if truncate else f"sync_copy_{spec.target}"
+    total, newest = 0, None
+    start = reported = time.time()
+
+    with pg.transaction(), pg.cursor() as cur:
+        if truncate:
+            cur.execute(f"DELETE FROM {spec.target}")
+        else:
+            cur.execute(f"CREATE TEMP TABLE {load_into} (LIKE {spec.target} INCLUDING DEFAULTS) ON COMMIT DROP")
+
+        with cur.copy(f"COPY {load_into} ({column_list}) FROM STDIN") as copy:
+            for records, chunk_newest in chunks:
+                for record in records:
+                    copy.write_row(tuple(record.values()))
+                total += len(records)
+                if chunk_newest and (newest is None or chunk_newest > newest):
+                    newest = chunk_newest
+                if time.time() - reported >= PROGRESS_EVERY_SECONDS:
+                    reported = time.time()
+                    print(f"📥 {spec.target}: {total} rows streamed ({total / (reported - start):.0f}/s)")
+
+        if not truncate:
+            updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c != spec.target_key)
+            cur.execute(
+                f"INSERT INTO {spec.target} ({column_list}) SELECT {column_list} FROM {load_into} "
+                f"ON CONFLICT ({spec.target_key}) DO UPDATE SET {updates}"
+            )
+
+    return UploadResult(total, 0, 0, newest)
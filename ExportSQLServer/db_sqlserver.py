@@ -1,18 +1,106 @@
-# db_sqlserver.py
-import pyodbc
-
-def get_sqlserver_connection():
-    """Connect to the local SQL Server database and return the connection object."""
-    try:
-        conn = pyodbc.connect(
-            "DRIVER={ODBC Driver 17 for SQL Server};"
-            "SERVER=localhost;"
-            "DATABASE=HussainOils2023;"
-            "UID=RemoteUser;"
-            "PWD=test12345;"
-        )
-        print("✅ Connected to SQL Server successfully.")
-        return conn
-    except Exception as e:
-        print(f"❌ SQL Server connection failed: {e}")
-        raise
+# db_sqlserver.py
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pyodbc
+
+# SQLSERVER_CONNECTION_STRING points the sync at another database, e.g. the benchmark stand-in.
+CONNECTION_STRING = os.environ.get(
+    "SQLSERVER_CONNECTION_STRING",
+    "DRIVER={ODBC Driver 17 for SQL Server};"
+    "SERVER=localhost;"
+    "DATABASE=HussainOils2023;"
+    "UID=RemoteUser;"
+    "PWD=test12345;",
+)
+
+def get_sqlserver_connection():
+    """Connect to the local SQL Server database and return the connection object."""
+    try:
+        conn = pyodbc.connect(CONNECTION_STRING)
+        print("✅ Connected to SQL Server successfully.")
+        return conn
+    except Exception as e:
+        print(f"❌ SQL Server connection failed: {e}")
+        raise
+
+
+class SqlServerPool:
+    """Reusable SQL Server connections shared by a sync run (or the sync service).
+
+    A connection is used by one thread at a time: take it with
+    `with pool.connection() as conn:` and it goes back to the pool afterwards.
+    Up to max_idle connections are kept open; one that sat idle longer than
+    check_after seconds is pinged with SELECT 1 before it is handed out and
+    replaced if the server dropped it.
+    """
+
+    def __init__(self, max_idle=8, check_after=30.0, connect=get_sqlserver_connection):
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self.connect = connect
+        self.idle = []            # (connection, time it was returned)
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                if not self.idle:
+                    break
+                conn, returned_at = self.idle.pop()
+            if time.monotonic() - returned_at < self.check_after or self._healthy(conn):
+                return conn
+            print("♻️ Dropping a stale SQL Server connection")
+            self._discard(conn)
+        return self.connect()
+
+    def release(self, conn, broken=False):
+        if not broken:
+            try:
+                conn.rollback()   # end the read transaction before the next user
+            except pyodbc.Error:
+                broken = True
+        with self.lock:
+            if not broken and not self.closed and len(self.idle) < self.max_idle:
+                self.idle.append((conn, time.monotonic()))
+                return
+        self._discard(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        broken = False
+        try:
+            yield conn
+        except pyodbc.Error:
+            broken = True
+            raise
+        finally:
+            self.release(conn, broken)
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+    @staticmethod
+    def _healthy(conn):
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1").fetchone()
+            cursor.close()
+            return True
+        except pyodbc.Error:
+            return False
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.close()
+        except pyodbc.Error:
+            pass
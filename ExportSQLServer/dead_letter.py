@@ -0,0 +1,58 @@
+# dead_letter.py
+"""Local spool for rows Supabase would not take, replayed at the start of the next run.
+
+One JSON line per failed group of rows in spool/<table>.jsonl:
+    {"error": "...", "rows": [{...}, {...}]}
+Rows are stored exactly as they were encoded for upload.
+"""
+import json
+import os
+import threading
+
+from paths import SPOOL_DIR
+
+_lock = threading.Lock()
+
+
+def spool_path(table_name):
+    return os.path.join(SPOOL_DIR, f"{table_name}.jsonl")
+
+
+def spool_rows(table_name, parts, error):
+    """Append encoded rows that could not be uploaded."""
+    line = '{"error": ' + json.dumps(str(error)[:500]) + ', "rows": [' + ",".join(parts) + "]}\n"
+    with _lock:
+        os.makedirs(SPOOL_DIR, exist_ok=True)
+        with open(spool_path(table_name), "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def take_spooled(table_name):
+    """Remove and return the spooled rows of a table as lists of encoded rows.
+
+    The spool file is moved aside first so rows that fail again during the
+    replay are spooled into a fresh file.
+    """
+    path = spool_path(table_name)
+    with _lock:
+        if not os.path.exists(path):
+            return []
+        replay_path = path + ".replay"
+        os.replace(path, replay_path)
+
+    groups = []
+    with open(replay_path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                rows = json.loads(line)["rows"]
+                groups.append([json.dumps(row, default=str, separators=(",", ":")) for row in rows])
+    os.remove(replay_path)
+    return groups
+
+
+def discard_spooled(table_name):
+    """Drop spooled rows; used before a full reload, which resends everything anyway."""
+    with _lock:
+        for path in (spool_path(table_name), spool_path(table_name) + ".replay"):
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,211 @@
+# deletions.py
+"""Rows deleted in SQL Server, removed from Supabase by incremental runs.
+
+An incremental sync only sees the rows that still exist, so until now a
+voided sale or a removed ledger entry stayed in Supabase until the next full
+reload. For specs with propagate_deletes an incremental run also finds the
+keys that vanished and deletes them in batches (uploader.delete_keys):
+
+- With change tracking enabled on the source table
+  (ALTER TABLE tblGeneralLedger ENABLE CHANGE_TRACKING) the keys deleted
+  since the last run come straight from CHANGETABLE(CHANGES ...).
+- Otherwise, every KEY_CHECK_HOURS, the key sets are compared. Both sides
+  count and add up their keys per bucket of consecutive keys (a GROUP BY in
+  SQL Server, sync_key_buckets() in Supabase), and only the buckets that
+  differ are listed key by key. A day without deletes costs one aggregate
+  over the primary key on each side. A comparison that fails, e.g. because
+  sync_key_buckets() is missing or refused, is tried again after
+  KEY_CHECK_RETRY_MINUTES rather than on every run.
+
+The change tracking version, the time of the last key comparison and the
+retry time of a failed one of every table are kept in state/deletions.json. Rows only Supabase is missing are
+reported, not sent; an edit or the next full reload brings them over.
+"""
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+from paths import STATE_DIR
+from uploader import DELETE_CHUNK, UploadError, delete_keys
+
+STATE_PATH = os.path.join(STATE_DIR, "deletions.json")
+KEY_CHECK_HOURS = float(os.environ.get("SYNC_KEY_CHECK_HOURS", "24"))   # between key set comparisons
+KEY_CHECK_RETRY_MINUTES = float(os.environ.get("SYNC_KEY_CHECK_RETRY_MINUTES", "60"))   # after a failed one
+MAX_BUCKETS = 500         # key buckets per comparison; the sync_key_buckets() result fits one response
+KEY_PAGE = 1000           # keys per request when listing a bucket in Supabase
+
+_state_lock = threading.Lock()
+
+
+def _load_state(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(table_name, entry, path):
+    with _state_lock:
+        state = _load_state(path)
+        state.setdefault(table_name, {}).update(entry)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, path)
+
+
+class DeleteCheck:
+    """Deleted-key detection for one incremental table run: start() before reading, run() after uploading.
+
+    source(after_key=None, until_key=None) returns the (FROM ... WHERE ...,
+    params) of every row of the spec that belongs in Supabase.
+    """
+
+    def __init__(self, spec, pool, supabase, rest, source, path=STATE_PATH):
+        self.spec = spec
+        self.pool = pool
+        self.supabase = supabase
+        self.rest = rest
+        self.source = source
+        self.path = path
+        self.state = _load_state(path).get(spec.target, {})
+        self.version = None       # change tracking version this run reads up to
+        self.due = False          # key sets get compared this run
+        self.removed = []         # keys run() deleted in Supabase
+
+    def _query(self, sql, *params):
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                return cursor.execute(sql, *params).fetchall()
+            finally:
+                cursor.close()
+
+    def start(self):
+        """Note the change tracking version, or whether the key sets are due for a comparison."""
+        (current, oldest), = self._query("SELECT CHANGE_TRACKING_CURRENT_VERSION(), "
+                                         "CHANGE_TRACKING_MIN_VALID_VERSION(OBJECT_ID(?))", self.spec.source)
+        if oldest is not None:
+            self.version = current
+            last = self.state.get("version")
+            if last is not None and last >= oldest:
+                return
+            # First run, or the retention period passed since the last one: compare once, then track.
+            if self._retry_pending():
+                self.version = None     # the old version is no longer valid either; no deletes this run
+                return
+            print(f"⚠️ {self.spec.target}: no usable change tracking version, comparing key sets")
+            self.due = True
+            return
+        checked = self.state.get("checked")
+        self.due = checked is None or datetime.now() - datetime.fromisoformat(checked) >= timedelta(
+            hours=KEY_CHECK_HOURS)
+        if self.due and self._retry_pending():
+            self.due = False
+
+    def _retry_pending(self):
+        """Whether a failed key set comparison is still waiting out KEY_CHECK_RETRY_MINUTES."""
+        retry = self.state.get("retry_after")
+        if retry is None or datetime.now() >= datetime.fromisoformat(retry):
+            return False
+        print(f"⏸️ {self.spec.target}: last key set comparison failed, deletes not checked until {retry}")
+        return True
+
+    def deleted_keys(self):
+        """Keys that are in Supabase but no longer in SQL Server."""
+        if self.version is not None and not self.due:
+            rows = self._query(f"SELECT ct.{self.spec.key} FROM CHANGETABLE(CHANGES {self.spec.source}, ?) AS ct "
+                               "WHERE ct.SYS_CHANGE_OPERATION = 'D'", self.state["version"])
+            return sorted(row[0] for row in rows)
+        if self.due:
+            try:
+                return self.compare_keys()
+            except Exception:
+                retry = datetime.now() + timedelta(minutes=KEY_CHECK_RETRY_MINUTES)
+                _save_state(self.spec.target, {"retry_after": retry.isoformat(timespec="seconds")}, self.path)
+                raise
+        return []
+
+    def compare_keys(self):
+        spec = self.spec
+        sql, params = self.source()
+        (low, high), = self._query(f"SELECT MIN(t.{spec.key}), MAX(t.{spec.key}) {sql}", *params)
+        if low is None:
+            # More likely a bad closing date than a table that really lost every row; never empty Supabase.
+            print(f"⚠️ {spec.target}: no rows in SQL Server, deletes not checked")
+            return []
+        if not (isinstance(low, int) and isinstance(high, int)):
+            print(f"⚠️ {spec.target}: key set comparison needs an integer key, deletes not checked")
+            return []
+        size = max(1, -(-(max(high, 0) + 1) // MAX_BUCKETS))
+        key = f"t.{spec.key}"
+        # Supabase first, so a missing or refused sync_key_buckets() costs no aggregate in SQL Server.
+        remote = {row["bucket"]: (row["keys"], int(row["key_sum"])) for row in self.supabase.rpc(
+            "sync_key_buckets", {"table_name": spec.target, "key_column": spec.target_key, "bucket_size": size}
+        ).execute().data}
+        local = {bucket: (count, total) for bucket, count, total in self._query(
+            f"SELECT {key} / {size}, COUNT(*), SUM(CAST({key} AS bigint)) {sql} GROUP BY {key} / {size}", *params)}
+        differing = sorted(bucket for bucket in remote if remote[bucket] != local.get(bucket))
+        deleted, missing = [], 0
+        for bucket in differing:
+            first, last = bucket * size, (bucket + 1) * size - 1
+            # Supabase first: a key it lists and SQL Server no longer has afterwards really was deleted.
+            theirs = self.remote_keys(first, last)
+            bucket_sql, bucket_params = self.source(first - 1, last)
+            ours = {row[0] for row in self._query(f"SELECT {key} {bucket_sql}", *bucket_params)}
+            deleted.extend(sorted(theirs - ours))
+            missing += len(ours - theirs)
+        missing += sum(local[bucket][0] for bucket in local if bucket not in remote)
+        print(f"🔍 {spec.target}: key sets compared in {len(local)} bucket(s) of {size}, "
+              f"{len(differing)} differing")
+        if missing:
+            print(f"⚠️ {spec.target}: {missing} row(s) in SQL Server not in Supabase (yet); "
+                  f"rows changed after the run's boundary arrive next run, others with the next full reload")
+        return deleted
+
+    def remote_keys(self, first, last):
+        """The keys Supabase has from first through last."""
+        key = self.spec.target_key
+        keys = set()
+        while True:
+            response = self.rest.get(f"/{self.spec.target}", params=[
+                ("select", key), ("order", key), (key, f"gte.{first}"), (key, f"lte.{last}"), ("limit", KEY_PAGE)])
+            if response.is_error:
+                raise UploadError(response.status_code, response.text[:500])
+            page = [row[key] for row in response.json()]
+            keys.update(page)
+            if len(page) < KEY_PAGE:
+                return keys
+            first = page[-1] + 1
+
+    def run(self, metrics=None):
+        """Delete the keys that vanished from SQL Server in Supabase and return them.
+
+        If a request fails, removed still holds the keys deleted before it.
+        """
+        self.removed = []
+        deleted = self.deleted_keys()
+        try:
+            for i in range(0, len(deleted), DELETE_CHUNK):
+                chunk = deleted[i:i + DELETE_CHUNK]
+                delete_keys(self.rest, self.spec.target, self.spec.target_key, chunk)
+                self.removed.extend(chunk)
+        finally:
+            if self.removed:
+                print(f"🗑️ {self.spec.target}: {len(self.removed)} row(s) deleted in SQL Server removed from Supabase")
+                if metrics:
+                    metrics.add(rows_deleted=len(self.removed))
+        return deleted
+
+    def commit(self):
+        """The run finished: the next one tracks changes from this run's version."""
+        entry = {}
+        if self.version is not None:
+            entry["version"] = self.version
+        if self.due:
+            entry["checked"] = datetime.now().isoformat(timespec="seconds")
+        if entry:
+            _save_state(self.spec.target, entry, self.path)
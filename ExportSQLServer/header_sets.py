@@ -0,0 +1,92 @@
+# header_sets.py
+"""Header/detail co-extraction: a header table and its detail table read from one set of header keys.
+
+Detail specs with a header_key (tblsalesdetail, tbltransferdetail,
+tblpurchasedetail) used to re-run the header's closing-date and change
+filters through a join of their own, minutes after the header was read, so a
+bill posted in between could show up in the detail table but not in the
+header table. When header and detail sync in the same run, the header sync
+evaluates those filters once into a global temp table holding the key and
+change time of every qualifying header, reads its rows joined to that table,
+and the detail sync reads the detail rows of exactly those keys.
+
+Detail rows whose header is missing from SQL Server are no longer copied by
+the LEFT JOIN of transfers and purchases. The temp tables live on one pooled
+connection held for the run and are dropped at its end. A detail table whose
+high-water mark is behind its header's falls back to its own join, so no
+changed rows are skipped.
+"""
+import threading
+import uuid
+from dataclasses import replace
+
+
+def joined(spec, table, column):
+    """spec read through the captured header keys in table, matched on its column."""
+    return replace(spec, join=f"INNER JOIN {table} h ON h.HeaderKey = t.{column}",
+                   closing_date_column=None, change_column="h.ChangeDate")
+
+
+class HeaderSets:
+    """The header keys captured by one run, for the detail specs that follow their header."""
+
+    def __init__(self, specs, pool):
+        targets = {spec.target for spec in specs}
+        self.details = {}     # header target -> detail targets in this run
+        for spec in specs:
+            if spec.header_key and spec.depends_on[0] in targets:
+                self.details.setdefault(spec.depends_on[0], []).append(spec.target)
+        self.pool = pool
+        self.conn = None      # holds the temp tables; SQL Server drops them with its session
+        self.sets = {}        # header target -> (temp table, since)
+        self.lock = threading.Lock()
+
+    def header_spec(self, spec, since, source):
+        """The spec to read header spec with; source is its (FROM ... WHERE ..., params) at since."""
+        if spec.target not in self.details:
+            return spec
+        sql, params = source
+        table = f"##sync_{spec.target}_{uuid.uuid4().hex[:8]}"
+        with self.lock:
+            if self.conn is None:
+                self.conn = self.pool.acquire()
+            cursor = self.conn.cursor()
+            try:
+                cursor.execute(f"SELECT t.{spec.key} AS HeaderKey, {spec.change_column} AS ChangeDate "
+                               f"INTO {table} {sql}", *params)
+                count = cursor.rowcount
+                cursor.execute(f"CREATE UNIQUE CLUSTERED INDEX ix_header ON {table} (HeaderKey)")
+                self.conn.commit()
+            finally:
+                cursor.close()
+            self.sets[spec.target] = (table, since)
+        print(f"🧾 {spec.target}: {count} header key(s) captured for {', '.join(self.details[spec.target])}")
+        return joined(spec, table, spec.key)
+
+    def detail_spec(self, spec, since):
+        """The spec to read detail spec with: only the rows of the captured header keys if there are any."""
+        captured = self.sets.get(spec.depends_on[0]) if spec.header_key else None
+        if captured is None:
+            return spec
+        table, header_since = captured
+        if header_since is not None and (since is None or since < header_since):
+            print(f"⚠️ {spec.target}: behind {spec.depends_on[0]} (since {since}), reading it through its own join")
+            return spec
+        return joined(spec, table, spec.header_key)
+
+    def close(self):
+        """Drop the temp tables and hand their connection back to the pool."""
+        if self.conn is None:
+            return
+        broken = False
+        try:
+            cursor = self.conn.cursor()
+            for table, _ in self.sets.values():
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            cursor.close()
+            self.conn.commit()
+        except Exception as e:
+            print(f"⚠️ Could not drop the header key tables, closing their connection instead: {e}")
+            broken = True
+        self.pool.release(self.conn, broken)
+        self.conn = None
@@ -0,0 +1,57 @@
+@echo off
+setlocal enabledelayedexpansion
+
+REM Installs sync_service.py as the "MD-Accounting-Sync" Windows service with NSSM.
+REM Run as administrator. Output goes to logs\sync_out.log and logs\sync_err.log.
+REM Add SUPABASE_KEY=<service_role key> to AppEnvironmentExtra below; with the default anon key
+REM full reloads truncate the live tables instead of swapping in staging tables.
+REM Trigger a run:  curl -X POST http://localhost:8765/sync -d "{\"tables\": [\"tblsales\"]}"
+
+set "PYTHON_EXE=C:\Program Files\Python313\python.exe"
+set "SERVICE_NAME=MD-Accounting-Sync"
+
+cd /d "%~dp0"
+
+nssm version >nul 2>&1
+if %errorlevel% neq 0 (
+    if exist "D:\nssm-2.24\win64\nssm.exe" (
+        set "NSSM_PATH=D:\nssm-2.24\win64\nssm.exe"
+    ) else (
+        echo ❌ NSSM is not installed. Download it from https://nssm.cc/download
+        pause
+        exit /b 1
+    )
+) else (
+    set "NSSM_PATH=nssm"
+)
+
+sc query "%SERVICE_NAME%" >nul 2>&1
+if %errorlevel%==0 (
+    echo ♻️ Service already exists. Removing old one...
+    "%NSSM_PATH%" stop "%SERVICE_NAME%" >nul 2>&1
+    "%NSSM_PATH%" remove "%SERVICE_NAME%" confirm
+)
+
+if not exist "%~dp0logs" mkdir "%~dp0logs"
+
+"%NSSM_PATH%" install "%SERVICE_NAME%" "%PYTHON_EXE%" "sync_service.py"
+if %errorlevel% neq 0 (
+    echo ❌ Failed to install service
+    pause
+    exit /b 1
+)
+
+"%NSSM_PATH%" set "%SERVICE_NAME%" DisplayName "MD-Accounting Sync Service"
+"%NSSM_PATH%" set "%SERVICE_NAME%" Description "Keeps SQL Server tables synced to Supabase"
+"%NSSM_PATH%" set "%SERVICE_NAME%" Start SERVICE_AUTO_START
+"%NSSM_PATH%" set "%SERVICE_NAME%" AppDirectory "%~dp0"
+"%NSSM_PATH%" set "%SERVICE_NAME%" AppEnvironmentExtra PYTHONIOENCODING=utf-8 PYTHONUNBUFFERED=1
+"%NSSM_PATH%" set "%SERVICE_NAME%" AppStdout "%~dp0logs\sync_out.log"
+"%NSSM_PATH%" set "%SERVICE_NAME%" AppStderr "%~dp0logs\sync_err.log"
+"%NSSM_PATH%" set "%SERVICE_NAME%" AppStopMethodConsole 30000
+
+"%NSSM_PATH%" start "%SERVICE_NAME%"
+echo ✅ %SERVICE_NAME% installed and started.
+echo To stop:   nssm stop "%SERVICE_NAME%"
+echo To remove: nssm remove "%SERVICE_NAME%" confirm
+pause
@@ -0,0 +1,145 @@
+# metrics.py
+"""Per-table sync metrics: stage timings, throughput, bytes sent and retries.
+
+A TableMetrics is filled in while a table syncs: SQL fetch and conversion time
+by sync_engine, JSON encoding by batching, HTTP time, bytes and retries by the
+uploader. Every uploaded batch and every finished table is appended as one
+JSON line to logs/metrics.jsonl, and the latest result of each table is kept
+as Prometheus text in logs/metrics.prom (node_exporter textfile format; the
+sync service also serves it at GET /metrics). The table totals go into
+tblsynctablelogs through sync_state.log_table_sync().
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from paths import LOG_DIR as METRICS_DIR
+JSONL_PATH = os.path.join(METRICS_DIR, "metrics.jsonl")
+PROM_PATH = os.path.join(METRICS_DIR, "metrics.prom")
+
+COUNTERS = ("rows_fetched", "rows_uploaded", "rows_deleted", "bytes_sent", "json_bytes", "batches", "requests",
+            "retries", "throttled")
+TIMERS = ("fetch_seconds", "convert_seconds", "encode_seconds", "upload_seconds")
+
+# Summary fields stored in tblsynctablelogs (see supabase_sync_schema.sql).
+LOG_COLUMNS = ("duration_seconds", "rows_per_second", "bytes_sent", "json_bytes", "batches", "retries",
+               "fetch_seconds", "convert_seconds", "encode_seconds", "upload_seconds")
+
+PROM_HELP = {
+    "duration_seconds": "Wall time of the last sync of the table",
+    "rows_fetched": "Rows read from SQL Server by the last sync",
+    "rows_uploaded": "Rows that reached Supabase in the last sync",
+    "rows_deleted": "Rows deleted in Supabase because they vanished from SQL Server",
+    "rows_per_second": "Rows uploaded per second of wall time in the last sync",
+    "bytes_sent": "Request body bytes sent to Supabase in the last sync",
+    "json_bytes": "Size the delivered rows would have had as plain JSON bodies (compare with bytes_sent)",
+    "batches": "Upload batches in the last sync",
+    "requests": "HTTP requests made by the last sync, retries included",
+    "retries": "Requests resent after throttling or a dropped connection",
+    "throttled": "Responses that asked the uploader to back off (408/429/5xx)",
+    "fetch_seconds": "Time spent executing queries and fetching rows from SQL Server",
+    "convert_seconds": "Time spent converting fetched rows to dicts",
+    "encode_seconds": "Time spent serializing rows to JSON",
+    "upload_seconds": "Summed HTTP request time across concurrent uploads",
+    "last_run_timestamp_seconds": "Unix time the last sync of the table finished",
+    "success": "1 if the last sync of the table succeeded, 0 otherwise",
+}
+
+_lock = threading.Lock()
+_latest = {}   # table -> summary of its last finished sync
+
+
+def emit(event):
+    """Append one event as a JSON line to metrics.jsonl."""
+    line = json.dumps({"time": datetime.now().isoformat(timespec="milliseconds"), **event}, default=str)
+    with _lock:
+        try:
+            os.makedirs(METRICS_DIR, exist_ok=True)
+            with open(JSONL_PATH, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            print(f"⚠️ Could not write metrics: {e}")
+
+
+class TableMetrics:
+    """Counters and stage timers for one table sync; safe to update from any thread."""
+
+    def __init__(self, table, mode):
+        self.table = table
+        self.mode = mode
+        self.started = time.time()
+        self.values = dict.fromkeys(COUNTERS + TIMERS, 0)
+        self.lock = threading.Lock()
+
+    def add(self, **amounts):
+        with self.lock:
+            for name, amount in amounts.items():
+                self.values[name] += amount
+
+    def batch(self, number, rows, rows_sent, nbytes, seconds):
+        """Record one finished upload batch."""
+        self.add(batches=1)
+        emit({"event": "batch", "table": self.table, "batch": number, "rows": rows, "rows_sent": rows_sent,
+              "bytes": nbytes, "seconds": round(seconds, 4)})
+
+    def summary(self):
+        duration = time.time() - self.started
+        with self.lock:
+            values = dict(self.values)
+        for name in TIMERS:
+            values[name] = round(values[name], 3)
+        return {
+            "table": self.table,
+            "mode": self.mode,
+            "duration_seconds": round(duration, 3),
+            "rows_per_second": round(values["rows_uploaded"] / duration, 1) if duration > 0 else 0.0,
+            **values,
+        }
+
+    def finish(self, status):
+        """Emit the table summary, refresh metrics.prom and return the summary."""
+        summary = {**self.summary(), "status": status}
+        emit({"event": "table", **summary})
+        with _lock:
+            _latest[self.table] = {**summary, "last_run_timestamp_seconds": round(time.time()),
+                                   "success": int(status != "failed")}
+        write_prometheus()
+        return summary
+
+
+def latest():
+    """{table: summary} of the last finished sync of each table in this process."""
+    with _lock:
+        return {table: dict(summary) for table, summary in _latest.items()}
+
+
+def log_fields(summary):
+    """The part of a table summary stored in tblsynctablelogs."""
+    return {name: summary[name] for name in LOG_COLUMNS if name in summary}
+
+
+def prometheus_text():
+    """Latest per-table results in the Prometheus text exposition format."""
+    summaries = latest()
+    lines = []
+    for name, help_text in PROM_HELP.items():
+        lines.append(f"# HELP sync_table_{name} {help_text}")
+        lines.append(f"# TYPE sync_table_{name} gauge")
+        for table, summary in sorted(summaries.items()):
+            if name in summary:
+                lines.append(f'sync_table_{name}{{table="{table}",mode="{summary["mode"]}"}} {summary[name]}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus():
+    text = prometheus_text()
+    try:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        tmp = PROM_PATH + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, PROM_PATH)
+    except OSError as e:
+        print(f"⚠️ Could not write {PROM_PATH}: {e}")
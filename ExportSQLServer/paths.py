@@ -0,0 +1,15 @@
+# paths.py
+"""Where the sync keeps its files between runs.
+
+STATE_DIR holds the row hash index, checkpoints, cached snapshots, summary
+totals and delete tracking; SPOOL_DIR the rows Supabase would not take;
+LOG_DIR the metrics of every run (metrics.py). SYNC_STATE_DIR, SYNC_SPOOL_DIR
+and SYNC_LOG_DIR move them, e.g. for a second installation or the
+benchmarks, which must never touch a real run's files.
+"""
+import os
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STATE_DIR = os.environ.get("SYNC_STATE_DIR") or os.path.join(HERE, "state")
+SPOOL_DIR = os.environ.get("SYNC_SPOOL_DIR") or os.path.join(HERE, "spool")
+LOG_DIR = os.environ.get("SYNC_LOG_DIR") or os.path.join(HERE, "logs")
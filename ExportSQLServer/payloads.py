@@ -0,0 +1,73 @@
+# payloads.py
+"""Request bodies for batch uploads: JSON or CSV, optionally gzip-compressed.
+
+Rows travel through the pipeline as JSON-encoded strings (batching.encode_row),
+which is also what the dead-letter spool and the snapshot cache keep; the body
+format is only chosen when a batch is sent:
+
+    json   [{"transactionid_pk":1,"accountcode":"01-02-0001",...},...]   (default)
+    csv    one header line with the column names, then one line of values per row
+
+CSV drops the key names repeated in every JSON object (about half of a ledger
+payload). PostgREST reads the unquoted value NULL as null, so a text column
+holding the literal string "NULL" would arrive as null.
+
+gzip (SYNC_PAYLOAD_ENCODING=gzip) compresses either format. PostgREST does
+not inflate request bodies itself, so only turn it on when the gateway in
+front of it does. benchmarks/bench_payload.py measures both against today's
+plain JSON.
+"""
+import csv
+import gzip
+import io
+import json
+import operator
+import os
+
+from batching import json_body
+
+PAYLOAD_FORMATS = ("json", "csv")
+PAYLOAD_FORMAT = os.environ.get("SYNC_PAYLOAD_FORMAT", "json")
+PAYLOAD_ENCODING = os.environ.get("SYNC_PAYLOAD_ENCODING", "")   # "gzip" or "" (none)
+GZIP_LEVEL = 5            # most of the saving of level 9 at a fraction of the CPU
+
+
+def json_size(parts):
+    """Bytes of the plain JSON body of parts; encode_row output is ASCII."""
+    return sum(len(part) for part in parts) + len(parts) + 1
+
+
+def csv_body(parts):
+    """A CSV body with a header line for JSON-encoded rows that share the same keys."""
+    rows = json.loads(json_body(parts))      # one decode for the whole batch
+    header = list(rows[0]) if rows else []
+    values = operator.itemgetter(*header) if len(header) > 1 else lambda row: [row[name] for name in header]
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(header)
+    writer.writerows(["NULL" if value is None else value for value in values(row)] for row in rows)
+    return out.getvalue()
+
+
+def payload_options(payload_format=None, encoding=None):
+    """The (format, encoding) to send with, defaulting to the environment; ValueError if unknown."""
+    payload_format = payload_format or PAYLOAD_FORMAT
+    encoding = PAYLOAD_ENCODING if encoding is None else encoding
+    if payload_format not in PAYLOAD_FORMATS:
+        raise ValueError(f"Unknown payload format {payload_format!r}, expected one of {', '.join(PAYLOAD_FORMATS)}")
+    if encoding not in ("", "gzip"):
+        raise ValueError(f"Unknown payload encoding {encoding!r}, expected gzip or nothing")
+    return payload_format, encoding
+
+
+def encode_payload(parts, payload_format=None, encoding=None):
+    """The request body for parts and the headers describing it."""
+    payload_format, encoding = payload_options(payload_format, encoding)
+    if payload_format == "json":
+        body, headers = json_body(parts).encode(), {"Content-Type": "application/json"}
+    else:
+        body, headers = csv_body(parts).encode(), {"Content-Type": "text/csv"}
+    if encoding == "gzip":
+        body = gzip.compress(body, GZIP_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
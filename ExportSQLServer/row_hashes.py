@@ -0,0 +1,91 @@
+# row_hashes.py
+"""Per-row content hashes for diff syncs of master tables.
+
+Tables whose EditDate cannot be trusted (spec.diff_sync) are read in full,
+but every converted row is hashed and compared with the hash it had when it
+was last uploaded. Only new and changed rows are upserted, and keys that no
+longer come back from SQL Server are deleted in Supabase, so a quiet day
+sends next to nothing.
+
+The hashes live in state/row_hashes.sqlite, one (table, key) -> 16-byte hash
+row each, and are only updated after the table synced without failures.
+"""
+import hashlib
+import os
+import sqlite3
+
+from batching import encode_row
+from paths import STATE_DIR
+
+INDEX_PATH = os.path.join(STATE_DIR, "row_hashes.sqlite")
+
+
+def row_hash(record):
+    return hashlib.blake2b(encode_row(record).encode(), digest_size=16).digest()
+
+
+class HashIndex:
+    """The stored hashes of one table plus the changes seen by the current run."""
+
+    def __init__(self, table_name, path=INDEX_PATH):
+        self.table_name = table_name
+        self.path = path
+        self.stored = self._load()
+        self.seen = set()
+        self.changed = {}   # key -> new hash
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE IF NOT EXISTS row_hashes ("
+                     "tablename TEXT NOT NULL, pk NOT NULL, hash BLOB NOT NULL, "
+                     "PRIMARY KEY (tablename, pk)) WITHOUT ROWID")
+        return conn
+
+    def _load(self):
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT pk, hash FROM row_hashes WHERE tablename = ?", (self.table_name,))
+            return dict(rows.fetchall())
+        finally:
+            conn.close()
+
+    def scan(self, chunks, key, only_changed=True):
+        """Hash the records of (records, newest) chunks; yield only new or changed ones when only_changed."""
+        for records, newest in chunks:
+            keep = []
+            for record in records:
+                pk = record[key]
+                digest = row_hash(record)
+                self.seen.add(pk)
+                if self.stored.get(pk) != digest:
+                    self.changed[pk] = digest
+                    keep.append(record)
+                elif not only_changed:
+                    keep.append(record)
+            if keep:
+                yield keep, newest
+
+    def deleted_keys(self):
+        """Keys uploaded before that the scanned source no longer returns."""
+        return [pk for pk in self.stored if pk not in self.seen]
+
+    def commit(self, replace=False):
+        """Store the scanned hashes; replace=True drops everything not seen (after a full reload)."""
+        removed = self.deleted_keys()
+        conn = self._connect()
+        try:
+            with conn:
+                if replace:
+                    conn.execute("DELETE FROM row_hashes WHERE tablename = ?", (self.table_name,))
+                else:
+                    conn.executemany("DELETE FROM row_hashes WHERE tablename = ? AND pk = ?",
+                                     ((self.table_name, pk) for pk in removed))
+                conn.executemany("INSERT OR REPLACE INTO row_hashes (tablename, pk, hash) VALUES (?, ?, ?)",
+                                 ((self.table_name, pk, digest) for pk, digest in self.changed.items()))
+                if replace:
+                    unchanged = ((self.table_name, pk, self.stored[pk])
+                                 for pk in self.seen if pk not in self.changed)
+                    conn.executemany("INSERT INTO row_hashes (tablename, pk, hash) VALUES (?, ?, ?)", unchanged)
+        finally:
+            conn.close()
@@ -0,0 +1,55 @@
+# scheduler.py
+"""Run table syncs concurrently while keeping parents ahead of their children."""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DEFAULT_JOBS = 4
+
+
+def run_in_dependency_order(specs, run_one, max_workers=DEFAULT_JOBS):
+    """Call run_one(spec) for every spec on a pool of max_workers threads.
+
+    A spec starts once every spec it depends_on (among the ones given) has
+    finished; independent specs run side by side. When a spec fails its
+    dependents are skipped. Returns {target: exception} for failed/skipped specs.
+    """
+    specs_by_target = {spec.target: spec for spec in specs}
+    waiting_on = {
+        spec.target: {parent for parent in spec.depends_on if parent in specs_by_target}
+        for spec in specs
+    }
+    finished, failed, running = set(), {}, {}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="sync") as pool:
+
+        def start_ready():
+            changed = True
+            while changed:
+                changed = False
+                for target in list(waiting_on):
+                    parents = waiting_on[target]
+                    broken = parents & failed.keys()
+                    if broken:
+                        del waiting_on[target]
+                        failed[target] = RuntimeError(f"skipped, parent failed: {', '.join(sorted(broken))}")
+                        print(f"⏭️ {target}: {failed[target]}")
+                        changed = True
+                    elif parents <= finished:
+                        del waiting_on[target]
+                        running[pool.submit(run_one, specs_by_target[target])] = target
+
+        start_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                target = running.pop(future)
+                try:
+                    future.result()
+                    finished.add(target)
+                except Exception as e:
+                    print(f"❌ {target} failed: {e}")
+                    failed[target] = e
+            start_ready()
+
+    for target in waiting_on:
+        failed[target] = RuntimeError("dependency cycle in table specs")
+    return failed
@@ -0,0 +1,257 @@
+# snapshot_cache.py
+"""On-disk snapshot of the batches extracted for one table run (sync.py --cache).
+
+With the cache on, SQL Server is read at full speed into state/cache/<table>/
+while the uploader works through the batches from disk behind it:
+
+    manifest.json     mode, since, boundary, load target, format; "extracted" once the read finished
+    batches.jsonl     one line per batch written: {"batch", "file", "rows", "newest"}
+    acks.log          one line per batch Supabase took (or that went to the dead-letter spool)
+    000001.arrow ...  the JSON-encoded rows of each batch
+
+Batches are Arrow IPC files (read back memory-mapped) when pyarrow is
+installed, JSON lines otherwise. If a run dies after the read finished, the
+next cached run of the table uploads only the batches not acknowledged yet
+and never queries SQL Server; sync.py --from-cache replays a whole snapshot,
+e.g. to another Supabase project. A snapshot is kept until the next cached
+run of its table replaces it, so it costs about the table's JSON size on disk.
+A half-uploaded snapshot is dropped instead of resumed once another run has
+synced the table: any run without the cache discards it, and a cached run
+finds it superseded when the table's high-water mark has passed its boundary.
+"""
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+
+from paths import STATE_DIR
+
+CACHE_DIR = os.path.join(STATE_DIR, "cache")
+CACHE_FORMAT = os.environ.get("SYNC_CACHE_FORMAT", "")   # "arrow" or "jsonl"; default: arrow if available
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401  (registers pyarrow.ipc)
+    except ImportError:
+        raise RuntimeError("Arrow snapshot files need pyarrow: pip install pyarrow "
+                           "(or set SYNC_CACHE_FORMAT=jsonl)") from None
+    return pyarrow
+
+
+def default_format():
+    if CACHE_FORMAT:
+        return CACHE_FORMAT
+    try:
+        _pyarrow()
+        return "arrow"
+    except RuntimeError:
+        return "jsonl"
+
+
+def _dump_time(value):
+    return value.isoformat() if value else None
+
+
+def _load_time(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+class SnapshotCache:
+    """The cached batches of one table; see the module docstring for the layout."""
+
+    def __init__(self, table_name, root=CACHE_DIR):
+        self.table_name = table_name
+        self.dir = os.path.join(root, table_name)
+        self.manifest = self._read_json("manifest.json")
+        self.cond = threading.Condition()
+        self.written = []           # batch entries written by this process
+        self.writing = False
+        self.error = None
+        self.ack_lock = threading.Lock()
+
+    def _path(self, name):
+        return os.path.join(self.dir, name)
+
+    def _read_json(self, name):
+        try:
+            with open(self._path(name), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_manifest(self):
+        tmp = self._path("manifest.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, self._path("manifest.json"))
+
+    @property
+    def extracted(self):
+        return bool(self.manifest and self.manifest.get("extracted"))
+
+    @property
+    def resumable(self):
+        """A previous run read the whole table but did not get every batch acknowledged."""
+        return self.extracted and not self.manifest.get("uploaded")
+
+    def superseded(self, high_water_mark):
+        """A later run already synced the table past the changes this snapshot reaches."""
+        reach = self.boundary or self.newest_change()
+        return high_water_mark is not None and (reach is None or reach < high_water_mark)
+
+    def discard(self):
+        """Drop a snapshot not fully uploaded yet, so no later run resumes it; uploaded ones stay for replays."""
+        if self.manifest and not self.manifest.get("uploaded"):
+            shutil.rmtree(self.dir, ignore_errors=True)
+            self.manifest = None
+
+    @property
+    def since(self):
+        return _load_time(self.manifest.get("since"))
+
+    @property
+    def boundary(self):
+        return _load_time(self.manifest.get("boundary"))
+
+    # -- writing ---------------------------------------------------------------
+
+    def start(self, mode, since, load_into, upsert, boundary=None):
+        """Replace any previous snapshot of the table with an empty one."""
+        shutil.rmtree(self.dir, ignore_errors=True)
+        os.makedirs(self.dir)
+        self.manifest = {
+            "table": self.table_name,
+            "mode": mode,
+            "since": _dump_time(since),
+            "boundary": _dump_time(boundary),
+            "load_into": load_into,
+            "upsert": upsert,
+            "format": default_format(),
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "extracted": False,
+            "uploaded": False,
+        }
+        self._write_manifest()
+
+    def _write(self, number, parts, newest):
+        name = f"{number:06d}.{self.manifest['format']}"
+        tmp = self._path(name + ".tmp")
+        if self.manifest["format"] == "arrow":
+            pa = _pyarrow()
+            table = pa.table({"row": pa.array(parts, pa.string())})
+            with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        else:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write("\n".join(parts) + "\n")
+        os.replace(tmp, self._path(name))
+        entry = {"batch": number, "file": name, "rows": len(parts), "newest": _dump_time(newest)}
+        with open(self._path("batches.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        return entry
+
+    def _extract(self, batches, first, stop):
+        try:
+            for number, (parts, newest) in enumerate(batches, first):
+                if stop.is_set():
+                    return
+                entry = self._write(number, parts, newest)
+                with self.cond:
+                    self.written.append(entry)
+                    self.cond.notify_all()
+            self.manifest["extracted"] = True
+            self._write_manifest()
+        except Exception as e:
+            self.error = e
+        finally:
+            close = getattr(batches, "close", None)
+            if close:
+                close()
+            with self.cond:
+                self.writing = False
+                self.cond.notify_all()
+
+    def stage(self, batches, first=1):
+        """Write (parts, newest) batches to disk on a background thread; yield (number, parts, newest)
+        read back from disk as each one lands, numbered from first. Errors of the read are re-raised here."""
+        stop = threading.Event()
+        self.writing = True
+        writer = threading.Thread(target=self._extract, args=(batches, first, stop), daemon=True,
+                                  name=f"cache-{self.table_name}")
+        writer.start()
+        index = 0
+        try:
+            while True:
+                with self.cond:
+                    while index >= len(self.written) and self.writing:
+                        self.cond.wait()
+                    if index >= len(self.written):
+                        break
+                    entry = self.written[index]
+                index += 1
+                yield entry["batch"], self.read(entry), _load_time(entry["newest"])
+        finally:
+            stop.set()
+            writer.join()
+        if self.error:
+            raise self.error
+
+    # -- reading ---------------------------------------------------------------
+
+    def entries(self):
+        entries = []
+        try:
+            with open(self._path("batches.jsonl"), encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entries.append(json.loads(line))
+        except OSError:
+            pass
+        return entries
+
+    def acked(self):
+        try:
+            with open(self._path("acks.log"), encoding="utf-8") as f:
+                return {int(line) for line in f if line.strip()}
+        except OSError:
+            return set()
+
+    def read(self, entry):
+        """The encoded rows of one batch."""
+        path = self._path(entry["file"])
+        if self.manifest["format"] == "arrow":
+            pa = _pyarrow()
+            with pa.memory_map(path) as source:
+                return pa.ipc.open_file(source).read_all().column("row").to_pylist()
+        with open(path, encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def batches(self, entries):
+        """Yield (number, parts, newest) for the given batch entries."""
+        for entry in entries:
+            yield entry["batch"], self.read(entry), _load_time(entry["newest"])
+
+    def pending(self):
+        """Entries of the batches not acknowledged yet."""
+        acked = self.acked()
+        return [entry for entry in self.entries() if entry["batch"] not in acked]
+
+    def newest_change(self):
+        return max((_load_time(entry["newest"]) for entry in self.entries() if entry["newest"]), default=None)
+
+    # -- acknowledgements --------------------------------------------------------
+
+    def ack(self, number):
+        """Batch number was delivered (or spooled); a resumed run skips it."""
+        with self.ack_lock:
+            with open(self._path("acks.log"), "a", encoding="utf-8") as f:
+                f.write(f"{number}\n")
+
+    def finish(self):
+        """Mark the snapshot uploaded if the read finished and every batch was acknowledged."""
+        if self.extracted and not self.pending():
+            self.manifest["uploaded"] = True
+            self._write_manifest()
@@ -0,0 +1,278 @@
+-- Supabase-side objects used by the ExportSQLServer sync scripts.
+-- Run this once in the Supabase SQL editor; every statement is safe to re-run.
+
+-- Incremental sync: high-water mark (newest EditDate/CreatedDate shipped) per table run.
+ALTER TABLE tblsynctablelogs ADD COLUMN IF NOT EXISTS sync_mode text;
+ALTER TABLE tblsynctablelogs ADD COLUMN IF NOT EXISTS high_water_mark timestamp;
+
+-- Rows spooled locally for replay, and the error of a table that failed outright.
+ALTER TABLE tblsynctablelogs ADD COLUMN IF NOT EXISTS failed_records integer DEFAULT 0;
+ALTER TABLE tblsynctablelogs ADD COLUMN IF NOT EXISTS error text;
+
+-- Per-table timings (metrics.py): where each run spent its time.
+ALTER TABLE tblsynctablelogs ADD COLUMN IF NOT EXISTS duration_seconds double precision;
+ALTER TABLE tblsynctablelogs ADD COLUMN IF NOT EXISTS rows_per_second double precision;
+ALTER TABLE tblsynctablelogs ADD COLUMN IF NOT EXISTS bytes_sent bigint;
+ALTER TABLE tblsynctablelogs ADD COLUMN IF NOT EXISTS json_bytes bigint;
+ALTER TABLE tblsynctablelogs ADD COLUMN IF NOT EXISTS batches integer;
+ALTER TABLE tblsynctablelogs ADD COLUMN IF NOT EXISTS retries integer;
+ALTER TABLE tblsynctablelogs ADD COLUMN IF NOT EXISTS fetch_seconds double precision;
+ALTER TABLE tblsynctablelogs ADD COLUMN IF NOT EXISTS convert_seconds double precision;
+ALTER TABLE tblsynctablelogs ADD COLUMN IF NOT EXISTS encode_seconds double precision;
+ALTER TABLE tblsynctablelogs ADD COLUMN IF NOT EXISTS upload_seconds double precision;
+
+-- Progress of a table sync that has not finished yet (status 'checkpoint', see checkpoints.py):
+-- batches acknowledged without a gap, the last key reached per key range, and the full state.
+ALTER TABLE tblsynctablelogs ADD COLUMN IF NOT EXISTS checkpoint_batch integer;
+ALTER TABLE tblsynctablelogs ADD COLUMN IF NOT EXISTS checkpoint_key text;
+ALTER TABLE tblsynctablelogs ADD COLUMN IF NOT EXISTS checkpoint jsonb;
+
+-- Exact insert time, to find the last run of a table: last_sync is local time text with whole
+-- seconds, so a checkpoint and the run that completed after it can carry the same value.
+ALTER TABLE tblsynctablelogs ADD COLUMN IF NOT EXISTS logged_at timestamptz
+    NOT NULL DEFAULT clock_timestamp();
+CREATE INDEX IF NOT EXISTS idx_tblsynctablelogs_table_logged
+    ON tblsynctablelogs (tablename, logged_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_tblsynctablelogs_table_mark
+    ON tblsynctablelogs (tablename, status, high_water_mark DESC);
+
+-- Incremental runs upsert on the primary key of each target table, so every synced
+-- table needs a primary key or unique constraint on the column named below, e.g.:
+-- ALTER TABLE tblgeneralledger ADD PRIMARY KEY (transactionid_pk);
+-- ALTER TABLE tblsales ADD PRIMARY KEY (salesid_pk);
+-- ALTER TABLE tblsalesdetail ADD PRIMARY KEY (salesdetailid_pk);
+
+-- Diff syncs of master tables (TableSpec.diff_sync) delete rows that disappeared
+-- from SQL Server through the REST API, so the sync key needs DELETE on them, e.g.:
+-- GRANT DELETE ON tblchartofaccounts1, tblchartofaccounts2, tblbanks, tblcustomers,
+--     tblsuppliers, tblboatstatus, tblboats, tblstores, tblitems, tblbillprefix TO service_role;
+
+-- The sync_* functions below run as their owner (SECURITY DEFINER) and take a table name,
+-- so each one first checks it against this list of synced tables and their keys
+-- (TableSpec.target / target_key in table_specs.py). Only the owner can change the list.
+CREATE TABLE IF NOT EXISTS tblsync_tables (
+    tablename text PRIMARY KEY,
+    key_column text NOT NULL
+);
+REVOKE ALL ON tblsync_tables FROM PUBLIC, anon, authenticated;
+INSERT INTO tblsync_tables (tablename, key_column) VALUES
+    ('tblusers', 'userid_pk'), ('tblchartofaccounts1', 'accountcodecontrol'),
+    ('tblchartofaccounts2', 'accountcodesubsidairy'), ('tblbanks', 'bankid_pk'),
+    ('tblcustomers', 'customerid_pk'), ('tblsuppliers', 'supplierid_pk'),
+    ('tblboatstatus', 'boatstatusid_pk'), ('tblboats', 'boatid_pk'), ('tblcity', 'idcity'),
+    ('tblstores', 'storeid_pk'), ('tblitems', 'itemid_pk'), ('tblsales', 'salesid_pk'),
+    ('tblsalesdetail', 'salesdetailid_pk'), ('tblopeningbalances', 'salesid_pk'),
+    ('tblgeneralledger', 'transactionid_pk'), ('tblcheques', 'chequeid_pk'),
+    ('tbltransfers', 'transferid_pk'), ('tbltransferdetail', 'transferdetailid_pk'),
+    ('tblpurchases', 'purchaseid_pk'), ('tblpurchasedetail', 'purchasedetailid_pk'),
+    ('tblbillprefix', 'billprefixid_pk')
+ON CONFLICT (tablename) DO UPDATE SET key_column = excluded.key_column;
+
+CREATE OR REPLACE FUNCTION sync_check_table(checked_table text, checked_key text DEFAULT NULL)
+RETURNS void
+LANGUAGE plpgsql
+STABLE
+SET search_path = public
+AS $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM tblsync_tables
+                   WHERE tablename = checked_table AND (checked_key IS NULL OR key_column = checked_key)) THEN
+        RAISE EXCEPTION 'not a synced table (or not its key): % %', checked_table, coalesce(checked_key, '')
+            USING ERRCODE = 'insufficient_privilege';
+    END IF;
+END;
+$$;
+
+-- Incremental runs also delete rows removed in SQL Server (TableSpec.propagate_deletes,
+-- deletions.py), which needs DELETE on those tables too, e.g.:
+-- GRANT DELETE ON tblsales, tblsalesdetail, tblgeneralledger, tblcheques, tbltransfers,
+--     tbltransferdetail, tblpurchases, tblpurchasedetail TO service_role;
+-- Without change tracking in SQL Server they compare key sets in buckets of
+-- consecutive keys; this returns the count and sum of the keys in each bucket.
+CREATE OR REPLACE FUNCTION sync_key_buckets(table_name text, key_column text, bucket_size bigint)
+RETURNS TABLE (bucket bigint, keys bigint, key_sum numeric)
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    PERFORM sync_check_table(table_name, key_column);
+    RETURN QUERY EXECUTE format(
+        'SELECT (%1$I / $1)::bigint, count(*), sum(%1$I)::numeric FROM %2$I GROUP BY 1 ORDER BY 1',
+        key_column, table_name) USING bucket_size;
+END;
+$$;
+
+-- Balance summaries kept by the sync while it streams the ledger and sales (aggregates.py).
+-- Reports can read these few hundred rows instead of aggregating tblgeneralledger.
+CREATE TABLE IF NOT EXISTS tblsync_account_balances (
+    accountcode text PRIMARY KEY,
+    debit numeric(18, 2) NOT NULL DEFAULT 0,
+    credit numeric(18, 2) NOT NULL DEFAULT 0,
+    balance numeric(18, 2) NOT NULL DEFAULT 0,
+    entries integer NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS tblsync_boat_balances (
+    accountcode text NOT NULL,
+    boatid_fk integer NOT NULL,
+    debit numeric(18, 2) NOT NULL DEFAULT 0,
+    credit numeric(18, 2) NOT NULL DEFAULT 0,
+    balance numeric(18, 2) NOT NULL DEFAULT 0,
+    entries integer NOT NULL DEFAULT 0,
+    PRIMARY KEY (accountcode, boatid_fk)
+);
+CREATE TABLE IF NOT EXISTS tblsync_customer_sales (
+    customerid_fk integer PRIMARY KEY,
+    bill_amount numeric(18, 2) NOT NULL DEFAULT 0,
+    entries integer NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS tblsync_customer_boat_sales (
+    customerid_fk integer NOT NULL,
+    boatid_fk integer NOT NULL,
+    bill_amount numeric(18, 2) NOT NULL DEFAULT 0,
+    entries integer NOT NULL DEFAULT 0,
+    PRIMARY KEY (customerid_fk, boatid_fk)
+);
+-- The app only reads the totals; only the sync's service_role key may write them.
+REVOKE ALL ON tblsync_account_balances, tblsync_boat_balances,
+    tblsync_customer_sales, tblsync_customer_boat_sales FROM PUBLIC, anon, authenticated;
+GRANT SELECT ON tblsync_account_balances, tblsync_boat_balances,
+    tblsync_customer_sales, tblsync_customer_boat_sales TO anon, authenticated;
+GRANT SELECT, INSERT, UPDATE ON tblsync_account_balances, tblsync_boat_balances,
+    tblsync_customer_sales, tblsync_customer_boat_sales TO service_role;
+
+-- Per customer and boat, the report figures of the summaries above: the active bill amount
+-- (tblsync_customer_boat_sales) and the balances (debit - credit) of the customer's advance
+-- (AdvAccount) and bounced-cheque (BcAccount) accounts (tblsync_boat_balances).
+-- Only sync_refresh_touched below writes it.
+CREATE TABLE IF NOT EXISTS tblsync_customer_boat_balances (
+    customerid_fk integer NOT NULL,
+    boatid_fk integer NOT NULL,
+    customername text,
+    bill_amount numeric(18, 2) NOT NULL DEFAULT 0,
+    advance numeric(18, 2) NOT NULL DEFAULT 0,
+    cheque_bounced numeric(18, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (customerid_fk, boatid_fk)
+);
+REVOKE ALL ON tblsync_customer_boat_balances FROM PUBLIC, anon, authenticated;
+GRANT SELECT ON tblsync_customer_boat_balances TO anon, authenticated, service_role;
+
+-- Targeted refresh (SYNC_REFRESH_FUNCTION, this function by default): after each run the
+-- sync calls it once with the keys whose summary totals changed. A customer's rows depend
+-- only on its own sales and its two accounts, so just the customers among customer_ids or
+-- holding one of account_codes are rebuilt, instead of re-aggregating the whole ledger as
+-- refreshing mv_customer_balance_summary_boats does. Every changed boat total also carries
+-- its customer or account, so boat_ids need no filter of their own.
+CREATE OR REPLACE FUNCTION sync_refresh_touched(account_codes text[], customer_ids integer[], boat_ids integer[])
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    DELETE FROM tblsync_customer_boat_balances
+     WHERE customerid_fk = ANY (customer_ids)
+        OR customerid_fk IN (SELECT customerid_pk FROM tblcustomers
+                              WHERE advaccount::text = ANY (account_codes)
+                                 OR bcaccount::text = ANY (account_codes));
+
+    INSERT INTO tblsync_customer_boat_balances
+        (customerid_fk, boatid_fk, customername, bill_amount, advance, cheque_bounced)
+    SELECT c.customerid_pk, boats.boatid_fk, c.customername,
+           COALESCE(s.bill_amount, 0), COALESCE(adv.balance, 0), COALESCE(bc.balance, 0)
+      FROM tblcustomers c
+     CROSS JOIN LATERAL (
+            SELECT boatid_fk FROM tblsync_customer_boat_sales WHERE customerid_fk = c.customerid_pk
+            UNION
+            SELECT boatid_fk FROM tblsync_boat_balances
+             WHERE accountcode IN (c.advaccount::text, c.bcaccount::text)) boats
+      LEFT JOIN tblsync_customer_boat_sales s
+        ON s.customerid_fk = c.customerid_pk AND s.boatid_fk = boats.boatid_fk
+      LEFT JOIN tblsync_boat_balances adv
+        ON adv.accountcode = c.advaccount::text AND adv.boatid_fk = boats.boatid_fk
+      LEFT JOIN tblsync_boat_balances bc
+        ON bc.accountcode = c.bcaccount::text AND bc.boatid_fk = boats.boatid_fk
+     WHERE (c.customerid_pk = ANY (customer_ids)
+            OR c.advaccount::text = ANY (account_codes)
+            OR c.bcaccount::text = ANY (account_codes))
+       AND COALESCE(s.entries, 0) + COALESCE(adv.entries, 0) + COALESCE(bc.entries, 0) > 0;
+END;
+$$;
+
+-- Staged full reloads (sync.py --staged): rows are loaded into <table>_staging and
+-- copied into the live table by one server-side call, so the app never reads a
+-- half-loaded table. The copy is DELETE + INSERT inside a single transaction:
+-- readers keep seeing the old rows until it commits and are never blocked,
+-- and views such as mv_customer_balance_summary keep pointing at the same table
+-- (a rename-based swap would silently re-point them at the staging table).
+
+CREATE OR REPLACE FUNCTION sync_create_staging(table_name text)
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    PERFORM sync_check_table(table_name);
+    EXECUTE format('CREATE TABLE IF NOT EXISTS %I (LIKE %I INCLUDING DEFAULTS)',
+                   table_name || '_staging', table_name);
+    -- Whatever lands in staging goes live with the next swap, so only the sync's role may write it
+    -- (Supabase's default privileges would give anon and authenticated every right on it).
+    -- UPDATE is for resumed loads, which upsert.
+    EXECUTE format('REVOKE ALL ON %I FROM PUBLIC, anon, authenticated', table_name || '_staging');
+    EXECUTE format('GRANT SELECT, INSERT, UPDATE ON %I TO service_role', table_name || '_staging');
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION sync_prepare_staging(table_name text)
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    PERFORM sync_check_table(table_name);
+    EXECUTE format('TRUNCATE TABLE %I', table_name || '_staging');
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION sync_swap_staging(table_name text)
+RETURNS bigint
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    copied bigint;
+BEGIN
+    PERFORM sync_check_table(table_name);
+    SET LOCAL statement_timeout = '300s';
+    EXECUTE format('DELETE FROM %I', table_name);
+    EXECUTE format('INSERT INTO %I SELECT * FROM %I', table_name, table_name || '_staging');
+    GET DIAGNOSTICS copied = ROW_COUNT;
+    EXECUTE format('TRUNCATE TABLE %I', table_name || '_staging');
+    RETURN copied;
+END;
+$$;
+
+-- Only the sync may call the table functions: Postgres lets PUBLIC execute new functions and
+-- Supabase grants anon and authenticated as well, i.e. anyone holding the app's anon key.
+-- Run the sync with the project's service_role key (SUPABASE_KEY), which the app never ships.
+REVOKE EXECUTE ON FUNCTION sync_check_table(text, text), sync_key_buckets(text, text, bigint),
+    sync_create_staging(text), sync_prepare_staging(text), sync_swap_staging(text),
+    sync_refresh_touched(text[], integer[], integer[])
+    FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION sync_key_buckets(text, text, bigint), sync_create_staging(text),
+    sync_prepare_staging(text), sync_swap_staging(text),
+    sync_refresh_touched(text[], integer[], integer[]) TO service_role;
+
+-- Fill the customer balances once; afterwards every run refreshes the customers it touched.
+-- A customer whose AdvAccount or BcAccount changes is picked up when its totals next move,
+-- or at once by running this again.
+SELECT sync_refresh_touched('{}', ARRAY(SELECT customerid_pk FROM tblcustomers), '{}');
+
+-- Create the staging tables once; PostgREST only sees new tables after a schema reload.
+SELECT sync_create_staging(tablename) FROM tblsync_tables;
+NOTIFY pgrst, 'reload schema';
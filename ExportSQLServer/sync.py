@@ -0,0 +1,82 @@
+# sync.py
+"""Copy SQL Server tables to Supabase.
+
+    python sync.py                      # every default table, full reload
+    python sync.py --incremental        # only rows changed since the last run
+    python sync.py --staged             # full reload via <table>_staging, swapped in at the end
+    python sync.py tblsales tblsalesdetail
+    python sync.py --jobs 2             # at most two tables at a time
+    python sync.py --copy tblgeneralledger   # load the ledger with COPY (needs SUPABASE_DB_URL)
+    python sync.py --cache tblgeneralledger  # stage batches on disk; a failed upload resumes from there
+    python sync.py --from-cache tblgeneralledger   # upload the cached snapshot again, no SQL Server
+    python sync.py --list
+"""
+import argparse
+import sys
+
+from scheduler import DEFAULT_JOBS
+from sync_engine import DEFAULT_READ_PARALLELISM, run_sync
+from uploader import DEFAULT_UPLOAD_CONCURRENCY
+from table_specs import TABLE_SPECS, select_specs
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sync SQL Server tables to Supabase.")
+    parser.add_argument("tables", nargs="*", help="Supabase table names to sync (default: all default tables)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="upsert only rows changed since the last successful sync")
+    parser.add_argument("--staged", action="store_true",
+                        help="load full reloads into <table>_staging and swap them in at the end")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS,
+                        help=f"tables synced concurrently (default {DEFAULT_JOBS}); headers still finish before details")
+    parser.add_argument("--upload-concurrency", type=int, default=DEFAULT_UPLOAD_CONCURRENCY,
+                        help=f"most batches of one table in flight at once (default {DEFAULT_UPLOAD_CONCURRENCY})")
+    parser.add_argument("--read-parallelism", type=int, default=DEFAULT_READ_PARALLELISM,
+                        help=f"key ranges of the largest tables read from SQL Server at once on full reloads "
+                             f"(default {DEFAULT_READ_PARALLELISM}, 1 = single stream)")
+    parser.add_argument("--copy", action="append", default=[], metavar="TABLE",
+                        help="load TABLE with PostgreSQL COPY over SUPABASE_DB_URL instead of REST (repeatable)")
+    parser.add_argument("--no-diff", action="store_true",
+                        help="sync master tables the classic way instead of by row-hash diff")
+    parser.add_argument("--cache", action="store_true",
+                        help="write extracted batches to state/cache and upload from there; "
+                             "a half-uploaded snapshot is resumed instead of re-reading SQL Server")
+    parser.add_argument("--from-cache", action="store_true",
+                        help="upload the cached snapshots of the tables again without reading SQL Server "
+                             "(e.g. into another project via SUPABASE_URL/SUPABASE_KEY)")
+    parser.add_argument("--list", action="store_true", help="list the known tables and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.list:
+        for spec in TABLE_SPECS:
+            notes = [] if spec.in_default_run else ["not in default run"]
+            if spec.diff_sync:
+                notes.append("diff")
+            if spec.loader != "rest":
+                notes.append(f"{spec.loader} loader")
+            print(f"{spec.target:<22} {'(' + ', '.join(notes) + ')' if notes else ''}")
+        return 0
+
+    try:
+        specs = select_specs(args.tables)
+        copy_tables = {spec.target for spec in select_specs(args.copy)} if args.copy else set()
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+
+    try:
+        run_sync(specs, incremental=args.incremental, stamp_last_sync=not args.tables and not args.from_cache,
+                 jobs=args.jobs, upload_concurrency=args.upload_concurrency, staged=args.staged,
+                 copy_tables=copy_tables, read_parallelism=args.read_parallelism,
+                 diff=not args.no_diff, cache=args.cache, from_cache=args.from_cache)
+    except Exception as e:
+        print(f"❌ Sync failed: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
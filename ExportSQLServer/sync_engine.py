@@ -0,0 +1,689 @@
+# sync_engine.py
+"""One fetch -> convert -> upload pipeline shared by every table in table_specs.py.
+
+Rows are streamed: the source is read in primary-key pages (keyset queries
+with the closing date bound as a parameter), each fetchmany() chunk is
+converted and uploaded as it arrives, and the next chunk is fetched on a
+background thread while the current one is in flight. Memory stays at a few
+batches no matter how large the table is. The biggest tables can be read as
+several key ranges on separate connections at once.
+"""
+import os
+import queue
+import threading
+import time
+from functools import partial
+
+import httpx
+
+from aggregates import REFRESH_FUNCTION, Summary, TouchedKeys, aggregates_for, needs_rebuild
+from batching import byte_batches
+from checkpoints import Checkpoint, clear_checkpoint
+from converters import make_converter
+from copy_loader import copy_rows
+from db_postgres import get_postgres_connection
+from db_sqlserver import SqlServerPool
+from db_supabase import get_rest_session, get_supabase_client
+from dead_letter import discard_spooled, take_spooled
+from deletions import DeleteCheck
+from header_sets import HeaderSets
+from metrics import TableMetrics, log_fields
+from payloads import payload_options
+from row_hashes import HashIndex
+from scheduler import DEFAULT_JOBS, run_in_dependency_order
+from snapshot_cache import SnapshotCache
+from sync_state import get_high_water_mark, log_table_failure, log_table_sync, record_last_sync
+from uploader import DEFAULT_UPLOAD_CONCURRENCY, BatchUploader, UploadError, delete_keys
+
+FETCH_SIZE = 2000         # rows per fetchmany(); upload batches are sized by bytes
+PAGE_SIZE = 50000         # rows per keyset query against SQL Server
+PREFETCH_BATCHES = 2     # converted batches kept ready ahead of the uploader
+DEFAULT_READ_PARALLELISM = 4   # key ranges read at once for specs with parallel_read
+# SYNC_SNAPSHOT_ISOLATION=1 reads each key range in one SNAPSHOT transaction, so its pages all see the
+# table as it was when the range started (needs ALTER DATABASE ... SET ALLOW_SNAPSHOT_ISOLATION ON).
+SNAPSHOT_ISOLATION = os.environ.get("SYNC_SNAPSHOT_ISOLATION", "") == "1"
+
+
+def read_closing_date(conn):
+    """MasterClosingDate from tblGlobalSettings; rows on or before it are never synced."""
+    cursor = conn.cursor()
+    try:
+        row = cursor.execute("SELECT MasterClosingDate FROM tblGlobalSettings").fetchone()
+    finally:
+        cursor.close()
+    return row[0] if row else None
+
+
+def read_boundary(conn):
+    """SQL Server's clock at the start of a run; incremental reads stop at it and the next run starts there."""
+    cursor = conn.cursor()
+    try:
+        return cursor.execute("SELECT GETDATE()").fetchone()[0]
+    finally:
+        cursor.close()
+
+
+def source_clause(spec, since=None, closing_date=None, after_key=None, until_key=None, boundary=None):
+    """FROM ... WHERE ... selecting the rows of a spec to sync; returns (sql, params).
+
+    since and boundary select the rows changed in [since, boundary).
+    """
+    sql = f"FROM {spec.source} t"
+    if spec.join:
+        sql += f" {spec.join}"
+
+    where, params = [], []
+    if spec.closing_date_column:
+        where.append(f"{spec.closing_date_column} > ?")
+        params.append(closing_date)
+    if since is not None:
+        where.append(f"{spec.change_column} >= ?")
+        params.append(since)
+    if boundary is not None:
+        where.append(f"{spec.change_column} < ?")
+        params.append(boundary)
+    if after_key is not None:
+        where.append(f"t.{spec.key} > ?")
+        params.append(after_key)
+    if until_key is not None:
+        where.append(f"t.{spec.key} <= ?")
+        params.append(until_key)
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return sql, params
+
+
+def build_query(spec, since=None, closing_date=None, after_key=None, until_key=None, page_size=PAGE_SIZE,
+                boundary=None):
+    """One keyset page of a spec; returns (sql, params).
+
+    Rows come back in primary-key order starting after after_key, so every page
+    is an index seek on the key instead of a sort of the whole table. The change
+    time is appended as SyncChangeDate.
+    """
+    select = ", ".join(f"t.{column}" for column in spec.columns)
+    source, params = source_clause(spec, since, closing_date, after_key, until_key, boundary)
+    return (f"SELECT TOP ({page_size}) {select}, {spec.change_column} AS SyncChangeDate {source} "
+            f"ORDER BY t.{spec.key}"), params
+
+
+def key_ranges(spec, cursor, partitions, since=None, closing_date=None, boundary=None):
+    """Split the rows to sync into up to `partitions` (after_key, until_key) ranges of equal key width.
+
+    Only integer keys are split; anything else is read as one range (None, None).
+    """
+    source, params = source_clause(spec, since, closing_date, boundary=boundary)
+    low, high = cursor.execute(f"SELECT MIN(t.{spec.key}), MAX(t.{spec.key}) {source}", *params).fetchone()
+    if partitions <= 1 or not isinstance(low, int) or not isinstance(high, int):
+        return [(None, None)]
+    step = max(1, -(-(high - low + 1) // partitions))
+    bounds = list(range(low - 1, high, step))
+    return [(after if after >= low else None, after + step if after + step < high else None) for after in bounds]
+
+
+def fetch_batches(spec, cursor, since=None, closing_date=None, after_key=None, until_key=None,
+                  page_size=PAGE_SIZE, fetch_size=FETCH_SIZE, metrics=None, boundary=None):
+    """Yield (records, newest change time) per fetchmany() chunk, reading the table page by page."""
+    change_index = len(spec.columns)
+    key_index = spec.columns.index(spec.key)
+    convert = None
+    while True:
+        sql, params = build_query(spec, since, closing_date, after_key, until_key, page_size, boundary)
+        start = time.perf_counter()
+        cursor.execute(sql, *params)
+        if convert is None:
+            convert = make_converter(cursor.description, change_index, spec.coerce)
+        page_rows = 0
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            fetched = time.perf_counter()
+            if not rows:
+                break
+            page_rows += len(rows)
+            after_key = rows[-1][key_index]
+            newest = max((row[change_index] for row in rows if row[change_index]), default=None)
+            records = convert(rows)
+            if metrics:
+                metrics.add(rows_fetched=len(rows), fetch_seconds=fetched - start,
+                            convert_seconds=time.perf_counter() - fetched)
+            yield records, newest
+            start = time.perf_counter()
+        if metrics:
+            metrics.add(fetch_seconds=fetched - start)
+        if page_rows < page_size:
+            return
+
+
+def read_range(spec, pool, since, closing_date, after_key, until_key, metrics=None, boundary=None):
+    """fetch_batches() for one key range on a pooled connection of its own."""
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            if SNAPSHOT_ISOLATION:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL SNAPSHOT")
+            yield from fetch_batches(spec, cursor, since, closing_date, after_key, until_key, metrics=metrics,
+                                     boundary=boundary)
+        finally:
+            try:
+                if SNAPSHOT_ISOLATION:
+                    # The level outlives the transaction on a pooled connection; later users expect the default.
+                    conn.rollback()
+                    cursor.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+            finally:
+                cursor.close()
+
+
+_END = object()
+
+
+def merge(iterables, depth=PREFETCH_BATCHES):
+    """Drive each iterable on its own background thread and yield their items as they arrive.
+
+    At most depth items wait in the shared queue. The first error raised by a
+    producer stops the others and is re-raised in the consumer.
+    """
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    errors = []
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce(iterable):
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except Exception as e:
+            errors.append(e)
+        finally:
+            close = getattr(iterable, "close", None)
+            if close:
+                close()
+            put(_END)
+
+    workers = [threading.Thread(target=produce, args=(iterable,), daemon=True) for iterable in iterables]
+    for worker in workers:
+        worker.start()
+    remaining = len(workers)
+    try:
+        while remaining:
+            item = items.get()
+            if item is _END:
+                remaining -= 1
+                if errors:
+                    break
+                continue
+            yield item
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join()
+    if errors:
+        raise errors[0]
+
+
+def prefetch(iterable, depth=PREFETCH_BATCHES):
+    """Drive iterable on a background thread, keeping up to depth items ready.
+
+    Lets the SQL Server fetch of batch N+1 overlap the upload of batch N.
+    Errors raised by the producer are re-raised in the consumer.
+    """
+    return merge([iterable], depth)
+
+
+def truncate_table(supabase, table_name):
+    """Empty a table before its full reload; if that fails the reload is aborted, not loaded on top of old rows."""
+    print(f"🧹 Truncating Supabase table '{table_name}' ...")
+    try:
+        supabase.rpc("truncate_table", {"table_name": table_name}).execute()
+    except Exception as e:
+        raise RuntimeError(f"could not truncate '{table_name}' via RPC, full reload aborted: {e}") from e
+
+
+def replay_spooled(spec, rest, upload_concurrency):
+    """Upsert rows a previous run spooled; rows that fail again go back to the spool."""
+    groups = take_spooled(spec.target)
+    if not groups:
+        return
+    print(f"♻️ {spec.target}: replaying {sum(len(g) for g in groups)} spooled row(s)")
+    uploader = BatchUploader(rest, spec.target, on_conflict=spec.target_key, concurrency=upload_concurrency)
+    for number, parts in enumerate(groups, 1):
+        uploader.submit(number, parts)
+    result = uploader.finish()
+    print(f"♻️ {spec.target}: {result.rows_uploaded} replayed, {result.rows_spooled} still failing")
+
+
+def plan_ranges(spec, pool, since=None, closing_date=None, read_parallelism=1, boundary=None):
+    """The (after_key, until_key) ranges to read spec in: several for full reloads of parallel_read specs."""
+    if not (spec.parallel_read and read_parallelism > 1 and since is None):
+        return [(None, None)]
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            return key_ranges(spec, cursor, read_parallelism, since, closing_date, boundary)
+        finally:
+            cursor.close()
+
+
+def read_table(spec, pool, since=None, closing_date=None, ranges=((None, None),), metrics=None, boundary=None):
+    """Yield the (records, newest change) chunks of spec to sync, each key range on a pooled connection."""
+    if len(ranges) > 1:
+        print(f"🔀 {spec.target}: reading {len(ranges)} key ranges in parallel")
+        yield from merge([read_range(spec, pool, since, closing_date, *bounds, metrics, boundary)
+                          for bounds in ranges])
+    elif ranges:
+        yield from read_range(spec, pool, since, closing_date, *ranges[0], metrics, boundary)
+
+
+def upload_batches(uploader, batches):
+    """Submit (number, parts, newest) batches to uploader and return its UploadResult."""
+    try:
+        for batch_number, parts, newest in batches:
+            uploader.submit(batch_number, parts, newest)
+    finally:
+        result = uploader.finish()
+    return result
+
+
+def push_summary(summary, rest):
+    """Commit a table's summary totals and upsert the changed groups; upload failures only warn."""
+    target = summary.aggregate.target
+    changed = summary.commit()
+    try:
+        sent = summary.push(rest)
+    except (UploadError, httpx.TransportError) as e:
+        print(f"⚠️ {target}: summary rows not uploaded, retried next run: {e}")
+        return
+    if sent:
+        print(f"📊 {target}: {sent} summary row(s) upserted ({changed} changed this run)")
+
+
+def propagate_deletes(deletes, summaries, metrics):
+    """Delete the rows removed in SQL Server and take them out of the summaries; failures only warn.
+
+    The delete state is left as it was, so the next run finds the same keys again.
+    """
+    try:
+        deletes.run(metrics)
+    except Exception as e:
+        print(f"⚠️ {deletes.spec.target}: deletes not propagated, retried next run: {e}")
+    else:
+        deletes.commit()
+    for summary in summaries:
+        summary.remove(deletes.removed)
+
+
+def refresh_touched(supabase, touched):
+    """Report the keys whose summaries changed and refresh just their rows (SYNC_REFRESH_FUNCTION)."""
+    if not touched:
+        return
+    print(f"📌 Summary totals changed for {touched}")
+    if not REFRESH_FUNCTION:
+        return
+    start = time.time()
+    try:
+        supabase.rpc(REFRESH_FUNCTION, touched.params()).execute()
+    except Exception as e:
+        print(f"⚠️ {REFRESH_FUNCTION} failed, the touched summary rows were not refreshed: {e}")
+        return
+    print(f"🔄 {REFRESH_FUNCTION}: touched summary rows refreshed in {time.time() - start:.2f}s")
+
+
+def complete_table(spec, supabase, result, metrics, since, mode, staged=False, boundary=None, summaries=(),
+                   rest=None):
+    """Swap in the staging table, push the summaries, log the run in tblsynctablelogs and return the rows sent.
+
+    The next incremental run starts at boundary (the run's read boundary) if
+    given, else at the newest change time uploaded. A staging table that lost
+    rows is not swapped in, and neither are the totals of its rows.
+    """
+    failed = result.rows_spooled + result.rows_lost
+    if staged:
+        if result.rows_lost:
+            raise RuntimeError(f"{result.rows_lost} rows lost, staging table not swapped in")
+        swap_start = time.time()
+        supabase.rpc("sync_swap_staging", {"table_name": spec.target}).execute()
+        print(f"🔀 {spec.target}: staging table swapped in ({time.time() - swap_start:.2f}s)")
+    for summary in summaries:
+        push_summary(summary, rest)
+
+    # Spooled rows are replayed by the next run, so only lost rows hold the high-water mark back.
+    # A full reload has no mark to hold: it logs none, which makes the next run reload again.
+    high_water_mark = since if result.rows_lost else (boundary or result.newest_change or since)
+    if result.rows_lost and mode == "full":
+        print(f"⚠️ {spec.target}: {result.rows_lost} rows lost in a full reload, the next run reloads it again")
+    metrics.add(rows_uploaded=result.rows_uploaded)
+    summary = metrics.finish("partial" if failed else "success")
+    log_table_sync(supabase, spec.target, result.rows_uploaded, high_water_mark, since is not None, failed,
+                   log_fields(summary), sync_mode=mode)
+    print(f"🏁 {spec.target}: {result.rows_uploaded} records in {summary['duration_seconds']:.2f}s "
+          f"({summary['rows_per_second']:.0f}/s; fetch {summary['fetch_seconds']:.1f}s, "
+          f"convert {summary['convert_seconds']:.1f}s, encode {summary['encode_seconds']:.1f}s, "
+          f"http {summary['upload_seconds']:.1f}s, {summary['retries']} retries)"
+          + (f", {failed} failed" if failed else ""))
+    return result.rows_uploaded
+
+
+def sync_table(spec, pool, supabase, rest, incremental=False, upload_concurrency=DEFAULT_UPLOAD_CONCURRENCY,
+               staged=False, pg=None, closing_date=None, read_parallelism=1, diff=True, cache=False,
+               touched=None, headers=None, boundary=None):
+    """Copy one table, reading it on connections from pool; returns the number of rows sent.
+
+    A full reload truncates the live table first, or with staged=True loads
+    <table>_staging and swaps it in at the end so readers never see it half-loaded.
+    With a Postgres connection (pg) the rows go through COPY instead of REST,
+    in a single transaction, so staging is not needed.
+
+    Specs with diff_sync are compared against their stored row hashes instead
+    (see row_hashes.py): only changed rows are upserted and vanished keys are
+    deleted. The first run, or diff=False without incremental, is a full
+    reload that rebuilds the hashes. Incremental runs of specs with
+    propagate_deletes also delete the rows removed in SQL Server (see deletions.py).
+
+    With cache=True REST loads go through a SnapshotCache on disk (see
+    snapshot_cache.py), and a snapshot an earlier run left half-uploaded is
+    finished first instead of reading SQL Server again, unless the table's
+    high-water mark has moved past it since. Runs without the cache drop
+    such a snapshot, as they supersede it.
+
+    The keys whose summary totals (aggregates.py) changed are added to touched.
+    headers (a HeaderSets) lets header and detail tables of one run read the
+    same header keys (see header_sets.py). Incremental reads stop at boundary,
+    the change time the whole run is cut at, and the next run starts from it.
+    """
+    snapshot = SnapshotCache(spec.target)
+    if snapshot.resumable:
+        if not cache or pg is not None:
+            print(f"🗑️ {spec.target}: dropping the half-uploaded cached snapshot, this run supersedes it")
+        elif snapshot.superseded(get_high_water_mark(supabase, spec.target)):
+            print(f"🗑️ {spec.target}: dropping the half-uploaded cached snapshot, a later run got past it")
+        else:
+            return resume_snapshot(spec, snapshot, supabase, rest, upload_concurrency)
+        snapshot.discard()
+    if not cache or pg is not None:
+        snapshot.discard()      # an unfinished extract too; a cached run replaces it in snapshot.start()
+        snapshot = None
+
+    hashes = HashIndex(spec.target) if spec.diff_sync and (diff or not incremental) else None
+    checkpoint = None
+    if pg is None and hashes is None:
+        checkpoint = Checkpoint.load(spec.target, spec.target_key, supabase)
+        if checkpoint is not None and checkpoint.mode != "full" and not incremental:
+            checkpoint.clear()      # an interrupted incremental run is superseded by this full reload
+            checkpoint = None
+    resumed = checkpoint is not None
+
+    diffing = hashes is not None and diff and bool(hashes.stored)
+    if resumed:
+        since, load_into, mode = checkpoint.since, checkpoint.load_into, checkpoint.mode
+        boundary = checkpoint.boundary
+        staged = load_into != spec.target
+    else:
+        since = get_high_water_mark(supabase, spec.target) if incremental and hashes is None else None
+        if since is not None and needs_rebuild(spec.target):
+            print(f"🧮 {spec.target}: summary totals miss rows of an interrupted run, reloading fully to rebuild them")
+            since = None
+        staged = staged and since is None and pg is None and not diffing
+        load_into = f"{spec.target}_staging" if staged else spec.target
+        mode = "diff" if diffing else "full" if since is None else "incremental"
+    metrics = TableMetrics(spec.target, mode)
+    summaries = []
+    try:
+        deletes = None
+        if spec.propagate_deletes and since is not None and hashes is None:
+            deletes = DeleteCheck(spec, pool, supabase, rest, partial(source_clause, spec, None, closing_date))
+            try:
+                deletes.start()
+            except Exception as e:
+                print(f"⚠️ {spec.target}: deletes not checked this run: {e}")
+                deletes = None
+        # Full reloads read every row whatever its change time; the boundary only cuts incremental windows.
+        # Co-extracted tables are read through the captured header keys, which already apply both.
+        read_spec, read_since, until = spec, since, boundary if since is not None else None
+        if headers is not None:
+            read_spec = headers.detail_spec(spec, since)
+            if read_spec is spec:
+                read_spec = headers.header_spec(spec, since, source_clause(spec, since, closing_date, boundary=until))
+            if read_spec is not spec:
+                read_since = until = None
+        if resumed:
+            print(f"⏩ {spec.target}: resuming the interrupted {mode} sync after batch {checkpoint.batch} "
+                  f"({checkpoint.rows} rows already uploaded)")
+            ranges = checkpoint.open_ranges
+        else:
+            if diffing:
+                print(f"🔍 {spec.target}: diff sync against {len(hashes.stored)} stored row hashes")
+                replay_spooled(spec, rest, upload_concurrency)
+            elif since is None:
+                discard_spooled(spec.target)
+                if pg is not None:
+                    print(f"📦 {spec.target}: full reload through COPY")
+                elif staged:
+                    print(f"🧹 Preparing staging table '{load_into}' ...")
+                    supabase.rpc("sync_prepare_staging", {"table_name": spec.target}).execute()
+                else:
+                    truncate_table(supabase, spec.target)
+            else:
+                print(f"🔁 Incremental sync of '{spec.target}': rows changed since {since}")
+                replay_spooled(spec, rest, upload_concurrency)
+            ranges = plan_ranges(read_spec, pool, read_since, closing_date, read_parallelism if since is None else 1,
+                                 until)
+            if pg is None and hashes is None:
+                checkpoint = Checkpoint(spec.target, spec.target_key, mode, since, load_into, ranges, supabase,
+                                        boundary=boundary)
+
+        chunks = read_table(read_spec, pool, read_since, closing_date, ranges, metrics, until)
+        if hashes is not None:
+            chunks = hashes.scan(chunks, spec.target_key, only_changed=diffing)
+        # A resumed full reload only sees the rows after its checkpoint, so its totals are moved, not rebuilt,
+        # and stay dirty; the table's next run is then a full reload (needs_rebuild).
+        summaries = [Summary(aggregate, spec.target_key, replace=mode == "full" and not resumed, touched=touched,
+                             resumed=resumed)
+                     for aggregate in aggregates_for(spec.target)]
+        for summary in summaries:
+            chunks = summary.scan(chunks)
+
+        # A resumed run may resend rows that made it before the interruption, so it always upserts.
+        upsert = since is not None or diffing or resumed
+        if pg is not None:
+            result = copy_rows(pg, spec, prefetch(chunks), truncate=not upsert)
+        else:
+            def batch_done(number):
+                for progress in (snapshot, checkpoint):
+                    if progress is not None:
+                        progress.ack(number)
+
+            uploader = BatchUploader(rest, spec.target, on_conflict=spec.target_key if upsert else None,
+                                     concurrency=upload_concurrency, load_into=load_into, metrics=metrics,
+                                     on_batch_done=batch_done)
+            first = checkpoint.batch + 1 if checkpoint else 1
+            if checkpoint is not None:
+                chunks = checkpoint.track_chunks(chunks)
+            batches = byte_batches(chunks, uploader.sizer, metrics)
+            if snapshot is not None:
+                snapshot.start(mode, since, load_into, upsert, boundary)
+                print(f"📄 {spec.target}: caching extracted batches in {snapshot.dir}")
+                batches = snapshot.stage(batches, first)
+            else:
+                batches = ((number, parts, newest)
+                           for number, (parts, newest) in enumerate(prefetch(batches), first))
+            if checkpoint is not None:
+                batches = checkpoint.track_batches(batches)
+            result = upload_batches(uploader, batches)
+            if resumed and not result.rows_lost:
+                # Rows acknowledged before the interruption count towards the high-water mark too.
+                result = result._replace(newest_change=max(filter(None, (result.newest_change, checkpoint.newest)),
+                                                           default=None))
+
+        if diffing:
+            deleted = hashes.deleted_keys()
+            if deleted:
+                delete_keys(rest, spec.target, spec.target_key, deleted)
+                metrics.add(rows_deleted=len(deleted))
+                print(f"🗑️ {spec.target}: {len(deleted)} row(s) no longer in SQL Server deleted")
+        if deletes is not None:
+            propagate_deletes(deletes, summaries, metrics)
+        if hashes is not None and not result.rows_spooled + result.rows_lost:
+            hashes.commit(replace=not diffing)
+        sent = complete_table(spec, supabase, result, metrics, since, mode, staged, boundary, summaries, rest)
+    except Exception:
+        metrics.finish("failed")
+        raise
+    finally:
+        for summary in summaries:
+            summary.close()
+    if checkpoint is not None:
+        checkpoint.clear()
+    if snapshot is not None:
+        snapshot.finish()
+    return sent
+
+
+def resume_snapshot(spec, snapshot, supabase, rest, upload_concurrency=DEFAULT_UPLOAD_CONCURRENCY):
+    """Upload the batches of a cached snapshot that no earlier run got acknowledged."""
+    manifest = snapshot.manifest
+    pending = snapshot.pending()
+    print(f"♻️ {spec.target}: resuming the {manifest['mode']} snapshot cached {manifest['created']}, "
+          f"{len(pending)} of {len(snapshot.entries())} batch(es) left; SQL Server is not queried")
+    metrics = TableMetrics(spec.target, "resume")
+    try:
+        # The rows were counted by the interrupted run, whose totals were rolled back.
+        for aggregate in aggregates_for(spec.target):
+            summary = Summary(aggregate, spec.target_key, resumed=True)
+            summary.commit()
+            summary.close()
+        # Some rows of a pending batch may have landed before the interruption, so even a full snapshot upserts.
+        uploader = BatchUploader(rest, spec.target, on_conflict=spec.target_key,
+                                 concurrency=upload_concurrency, load_into=manifest["load_into"],
+                                 metrics=metrics, on_batch_done=snapshot.ack)
+        result = upload_batches(uploader, snapshot.batches(pending))
+        if not result.rows_lost:
+            # Batches acknowledged by the earlier run count towards the high-water mark too.
+            result = result._replace(newest_change=snapshot.newest_change())
+        sent = complete_table(spec, supabase, result, metrics, snapshot.since, "resume",
+                              staged=manifest["load_into"] != spec.target, boundary=snapshot.boundary)
+    except Exception:
+        metrics.finish("failed")
+        raise
+    snapshot.finish()
+    clear_checkpoint(spec.target)
+    return sent
+
+
+def replay_snapshot(spec, supabase, rest, upload_concurrency=DEFAULT_UPLOAD_CONCURRENCY):
+    """Upload a table's whole cached snapshot again, e.g. to another Supabase project.
+
+    Full snapshots replace the target's rows, others are upserted. SQL Server
+    is not touched and the acknowledgements of the original run are left alone.
+    """
+    snapshot = SnapshotCache(spec.target)
+    if not snapshot.extracted:
+        raise RuntimeError(f"no complete cached snapshot of {spec.target} in {snapshot.dir}")
+    manifest = snapshot.manifest
+    entries = snapshot.entries()
+    print(f"📄 {spec.target}: replaying the {manifest['mode']} snapshot cached {manifest['created']} "
+          f"({len(entries)} batches)")
+    metrics = TableMetrics(spec.target, "replay")
+    try:
+        if not manifest["upsert"]:
+            truncate_table(supabase, spec.target)
+        uploader = BatchUploader(rest, spec.target, on_conflict=spec.target_key if manifest["upsert"] else None,
+                                 concurrency=upload_concurrency, metrics=metrics)
+        result = upload_batches(uploader, snapshot.batches(entries))
+        return complete_table(spec, supabase, result, metrics, snapshot.since, "replay")
+    except Exception:
+        metrics.finish("failed")
+        raise
+
+
+def run_sync(specs, incremental=False, stamp_last_sync=True, jobs=DEFAULT_JOBS,
+             upload_concurrency=DEFAULT_UPLOAD_CONCURRENCY, staged=False, copy_tables=(),
+             read_parallelism=DEFAULT_READ_PARALLELISM, pool=None, rest=None, diff=True, cache=False,
+             from_cache=False):
+    """Sync the given specs on up to `jobs` worker threads sharing one Supabase client.
+
+    SQL Server connections come from pool and the REST session is shared by all
+    workers; both are created for this run and closed at the end unless the
+    caller (e.g. the sync service) passes its own to keep them warm. Workers that
+    load a table with COPY (spec.loader == "copy" or listed in copy_tables) keep
+    one direct Postgres connection each. cache routes REST loads through the
+    on-disk snapshot cache; from_cache replays cached snapshots without
+    reading SQL Server at all. The summary rows of the keys the run touched
+    are refreshed at the end (see refresh_touched).
+
+    Every table is cut at the same boundary, SQL Server's clock when the run
+    starts: incremental reads take the rows changed before it, so a sale
+    posted mid-run lands in neither tblsales nor tblsalesdetail this time and
+    in both next time, and each table's next run starts exactly there.
+
+    Full reloads are not cut: a row missing its newer version would be missing
+    altogether from the reloaded table, and rows with no change time would be
+    dropped. Each table is read as it is when its read starts (header and
+    detail tables through the same header keys, see header_sets.py), so
+    tables can disagree on rows changed during the run until the next
+    incremental run, which starts at the boundary and picks those rows up.
+    """
+    payload_options()     # an unknown SYNC_PAYLOAD_FORMAT/ENCODING stops the run before any table is touched
+    supabase = get_supabase_client()
+    own_pool, own_rest = pool is None, rest is None
+    if own_pool:
+        pool = SqlServerPool(max_idle=max(1, jobs) * max(1, read_parallelism))
+    if own_rest:
+        rest = get_rest_session(max_connections=max(1, jobs) * upload_concurrency)
+    local = threading.local()
+    pg_connections = []
+    pg_lock = threading.Lock()
+    touched = TouchedKeys()
+    headers = HeaderSets(specs, pool)
+
+    def run_one(spec):
+        pg = None
+        try:
+            if from_cache:
+                return replay_snapshot(spec, supabase, rest, upload_concurrency)
+            if spec.loader == "copy" or spec.target in copy_tables:
+                if not hasattr(local, "pg"):
+                    local.pg = get_postgres_connection()
+                    with pg_lock:
+                        pg_connections.append(local.pg)
+                pg = local.pg
+            return sync_table(spec, pool, supabase, rest, incremental, upload_concurrency, staged, pg,
+                              closing_date, read_parallelism, diff, cache, touched, headers, boundary)
+        except Exception as e:
+            log_table_failure(supabase, spec.target, e)
+            raise
+
+    run_start = time.time()
+    try:
+        closing_date = boundary = None
+        if not from_cache:
+            with pool.connection() as conn:
+                boundary = read_boundary(conn)
+                if any(spec.closing_date_column for spec in specs):
+                    closing_date = read_closing_date(conn)
+            print(f"📸 Reading changes up to {boundary}")
+            if closing_date is not None:
+                print(f"📅 Master closing date: {closing_date}")
+        failed = run_in_dependency_order(specs, run_one, max_workers=jobs)
+    finally:
+        headers.close()
+        for conn in pg_connections:
+            conn.close()
+        if own_pool:
+            pool.close()
+        if own_rest:
+            rest.close()
+
+    refresh_touched(supabase, touched)
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {len(specs)} tables failed: {', '.join(failed)}")
+    print(f"🎉 Synced {len(specs)} tables in {time.time() - run_start:.2f}s")
+    if stamp_last_sync:
+        record_last_sync(supabase)
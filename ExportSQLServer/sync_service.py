@@ -0,0 +1,218 @@
+# sync_service.py
+"""Resident sync service: keeps connections warm and syncs each table on its own schedule.
+
+    python sync_service.py                  # run until stopped (Ctrl+C, NSSM or systemd stop)
+    python sync_service.py --port 0         # no trigger endpoint
+
+Every default table is synced incrementally every spec.schedule_minutes (the
+first cycle right after start-up). Runs can also be asked for on demand over
+a small HTTP endpoint bound to localhost:
+
+    curl -X POST localhost:8765/sync -d "{\"tables\": [\"tblsales\"]}"
+    curl -X POST localhost:8765/sync -d "{\"tables\": [\"tblitems\"], \"full\": true}"
+    curl localhost:8765/status
+    curl localhost:8765/metrics             # Prometheus text, see metrics.py
+
+One sync cycle runs at a time; triggers that arrive meanwhile are queued and
+run one per pass, each followed by the tables that fell due, so neither a
+stream of triggers nor a busy schedule holds the other back. Full reloads (a
+"full" trigger, or a table without a high-water mark yet) load staging tables
+and swap them in (see sync.py --staged and supabase_sync_schema.sql), so the
+app keeps reading the old rows instead of a truncated table while a table
+reloads. Staging needs SUPABASE_KEY to be the service_role key; with another
+key the service warns at start-up and full reloads truncate the live table.
+install_sync_service.bat (Windows/NSSM) and md-accounting-sync.service
+(Linux/systemd) install it as a service.
+"""
+import argparse
+import json
+import queue
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from db_sqlserver import SqlServerPool
+from db_supabase import get_rest_session, key_role
+from metrics import prometheus_text
+from scheduler import DEFAULT_JOBS
+from sync_engine import DEFAULT_READ_PARALLELISM, run_sync
+from table_specs import select_specs
+from uploader import DEFAULT_UPLOAD_CONCURRENCY
+
+DEFAULT_PORT = 8765
+RECENT_RUNS = 20          # cycles kept for /status
+
+
+class SyncService:
+    """Schedule loop plus a queue of on-demand runs, sharing one connection pool."""
+
+    def __init__(self, specs, jobs=DEFAULT_JOBS, upload_concurrency=DEFAULT_UPLOAD_CONCURRENCY,
+                 read_parallelism=DEFAULT_READ_PARALLELISM, cache=False):
+        self.specs = specs
+        self.cache = cache
+        self.jobs = jobs
+        self.upload_concurrency = upload_concurrency
+        self.read_parallelism = read_parallelism
+        # The staging functions only run for the service_role key (see supabase_sync_schema.sql).
+        self.staged = key_role() == "service_role"
+        if not self.staged:
+            print(f"⚠️ SUPABASE_KEY runs as '{key_role() or 'unknown'}', not service_role: full reloads truncate "
+                  f"and reload the live tables instead of swapping in staging tables")
+        self.pool = SqlServerPool(max_idle=max(1, jobs) * max(1, read_parallelism))
+        self.rest = get_rest_session(max_connections=max(1, jobs) * upload_concurrency)
+        self.next_due = {spec.target: 0.0 for spec in specs}   # time.monotonic(); 0 = due now
+        self.triggers = queue.Queue()
+        self.stop = threading.Event()
+        self.recent = []
+        self.lock = threading.Lock()
+
+    def trigger(self, tables=None, full=False):
+        """Queue an on-demand run; raises ValueError for unknown tables."""
+        specs = select_specs(tables)
+        self.triggers.put((specs, full))
+        return [spec.target for spec in specs]
+
+    def status(self):
+        now = time.monotonic()
+        with self.lock:
+            return {
+                "queued_triggers": self.triggers.qsize(),
+                "next_due_seconds": {target: max(0, round(due - now)) for target, due in self.next_due.items()},
+                "recent_runs": list(self.recent),
+            }
+
+    def run_cycle(self, specs, incremental, reason):
+        started = time.time()
+        print(f"⏳ {datetime.now():%Y-%m-%d %H:%M:%S} {reason} sync of {len(specs)} table(s)")
+        error = None
+        try:
+            run_sync(specs, incremental=incremental, jobs=self.jobs, upload_concurrency=self.upload_concurrency,
+                     staged=self.staged, read_parallelism=self.read_parallelism, pool=self.pool,
+                     rest=self.rest, cache=self.cache)
+        except Exception as e:
+            error = str(e)
+            print(f"❌ {reason} sync failed: {e}")
+
+        finished = time.monotonic()
+        with self.lock:
+            for spec in specs:
+                if spec.target in self.next_due:
+                    self.next_due[spec.target] = finished + spec.schedule_minutes * 60
+            self.recent.append({
+                "started": datetime.fromtimestamp(started).isoformat(timespec="seconds"),
+                "seconds": round(time.time() - started, 2),
+                "reason": reason,
+                "mode": "incremental" if incremental else "full",
+                "tables": [spec.target for spec in specs],
+                "error": error,
+            })
+            del self.recent[:-RECENT_RUNS]
+
+    def serve_forever(self):
+        while not self.stop.is_set():
+            now = time.monotonic()
+            due = any(self.next_due[spec.target] <= now for spec in self.specs)
+            wait = 0 if due else min(self.next_due.values()) - now
+            # At most one queued trigger per pass, then whatever fell due meanwhile.
+            try:
+                specs, full = self.triggers.get(timeout=min(wait, 1.0))   # wake up to notice stop
+            except queue.Empty:
+                pass
+            else:
+                self.run_cycle(specs, incremental=not full, reason="on-demand")
+            now = time.monotonic()
+            due = [spec for spec in self.specs if self.next_due[spec.target] <= now]
+            if due and not self.stop.is_set():
+                self.run_cycle(due, incremental=True, reason="scheduled")
+
+    def close(self):
+        self.pool.close()
+        self.rest.close()
+
+
+def make_handler(service):
+    class TriggerHandler(BaseHTTPRequestHandler):
+        def reply(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/status":
+                self.reply(200, service.status())
+            elif self.path == "/metrics":
+                body = prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                self.reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/sync":
+                self.reply(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                queued = service.trigger(request.get("tables"), bool(request.get("full")))
+            except (ValueError, AttributeError) as e:
+                self.reply(400, {"error": str(e)})
+                return
+            self.reply(202, {"queued": queued})
+
+        def log_message(self, format, *args):
+            print(f"🌐 {self.address_string()} {format % args}")
+
+    return TriggerHandler
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Keep SQL Server tables synced to Supabase on a schedule.")
+    parser.add_argument("--host", default="127.0.0.1", help="trigger endpoint address (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"trigger endpoint port (default {DEFAULT_PORT}, 0 = disabled)")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="tables synced concurrently")
+    parser.add_argument("--upload-concurrency", type=int, default=DEFAULT_UPLOAD_CONCURRENCY,
+                        help="most batches of one table in flight at once")
+    parser.add_argument("--read-parallelism", type=int, default=DEFAULT_READ_PARALLELISM,
+                        help="key ranges of the largest tables read at once on full reloads")
+    parser.add_argument("--cache", action="store_true",
+                        help="stage extracted batches on disk so failed uploads resume without re-reading")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    service = SyncService(select_specs(), args.jobs, args.upload_concurrency, args.read_parallelism,
+                          args.cache)
+    signal.signal(signal.SIGTERM, lambda *_: service.stop.set())
+
+    server = None
+    if args.port:
+        server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"🌐 Trigger endpoint on http://{args.host}:{args.port} (POST /sync, GET /status)")
+
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("🛑 Stopping sync service ...")
+        if server:
+            server.shutdown()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
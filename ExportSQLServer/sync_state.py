@@ -0,0 +1,117 @@
+# sync_state.py
+from datetime import datetime
+
+import pytz
+
+pk_tz = pytz.timezone("Asia/Karachi")
+
+
+def get_high_water_mark(supabase, table_name):
+    """Return the change time the last completed sync of table_name reached, or None.
+
+    A run that logged no high-water mark (a full reload that lost rows) makes
+    the next run a full reload too, instead of an incremental one from an
+    older mark over a table the reload already emptied.
+    """
+    try:
+        res = (
+            supabase.table("tblsynctablelogs")
+            .select("high_water_mark")
+            .eq("tablename", table_name)
+            .in_("status", ["success", "partial"])
+            .order("logged_at", desc=True)
+            .limit(1)
+            .execute()
+        )
+    except Exception as e:
+        print(f"⚠️ Could not read high-water mark for '{table_name}', doing a full reload: {e}")
+        return None
+
+    if not res.data or not res.data[0]["high_water_mark"]:
+        return None
+    return datetime.fromisoformat(res.data[0]["high_water_mark"]).replace(tzinfo=None)
+
+
+def log_table_sync(supabase, table_name, total_records, high_water_mark, incremental, failed_records=0,
+                   metrics=None, sync_mode=None):
+    """Record the run in tblsynctablelogs, including the high-water mark the next run starts from.
+
+    total_records is what actually reached Supabase; failed_records were spooled
+    for replay (or lost), which marks the run as partial. metrics holds the
+    timing columns from metrics.log_fields(); sync_mode overrides the
+    full/incremental label (e.g. "diff").
+    """
+    supabase.table("tblsynctablelogs").insert({
+        "tablename": table_name,
+        "last_sync": datetime.now(pk_tz).strftime("%Y-%m-%d %H:%M:%S"),
+        "total_records_synced": total_records,
+        "failed_records": failed_records,
+        "status": "partial" if failed_records else "success",
+        "sync_mode": sync_mode or ("incremental" if incremental else "full"),
+        "high_water_mark": high_water_mark.isoformat() if high_water_mark else None,
+        **(metrics or {}),
+    }).execute()
+
+
+def log_table_failure(supabase, table_name, error):
+    """Record a table whose sync stopped with an error."""
+    try:
+        supabase.table("tblsynctablelogs").insert({
+            "tablename": table_name,
+            "last_sync": datetime.now(pk_tz).strftime("%Y-%m-%d %H:%M:%S"),
+            "total_records_synced": 0,
+            "status": "failed",
+            "error": str(error)[:1000],
+        }).execute()
+    except Exception as e:
+        print(f"⚠️ Could not log failure of '{table_name}': {e}")
+
+
+def log_table_checkpoint(supabase, table_name, checkpoint):
+    """Record the progress of a running table sync (see checkpoints.py)."""
+    try:
+        supabase.table("tblsynctablelogs").insert({
+            "tablename": table_name,
+            "last_sync": datetime.now(pk_tz).strftime("%Y-%m-%d %H:%M:%S"),
+            "total_records_synced": checkpoint["rows"],
+            "status": "checkpoint",
+            "sync_mode": checkpoint["mode"],
+            "checkpoint_batch": checkpoint["batch"],
+            "checkpoint_key": ", ".join(str(after) for after, _ in checkpoint["ranges"]),
+            "checkpoint": checkpoint,
+        }).execute()
+    except Exception as e:
+        print(f"⚠️ Could not log checkpoint of '{table_name}': {e}")
+
+
+def get_table_checkpoint(supabase, table_name):
+    """The checkpoint of table_name if its last logged run stopped before finishing, else None."""
+    try:
+        res = (
+            supabase.table("tblsynctablelogs")
+            .select("status, checkpoint")
+            .eq("tablename", table_name)
+            .in_("status", ["success", "partial", "checkpoint"])
+            .order("logged_at", desc=True)     # last_sync has whole seconds, a checkpoint can share them
+            .limit(1)
+            .execute()
+        )
+    except Exception as e:
+        print(f"⚠️ Could not read checkpoint for '{table_name}': {e}")
+        return None
+
+    if not res.data or res.data[0]["status"] != "checkpoint":
+        return None
+    return res.data[0]["checkpoint"]
+
+
+def record_last_sync(supabase):
+    """Stamp tblsynclogs with the time of this run; the app shows it as 'last sync'."""
+    try:
+        supabase.rpc("truncate_table", {"table_name": "tblsynclogs"}).execute()
+    except Exception as e:
+        print(f"⚠️ Could not truncate 'tblsynclogs' via RPC: {e}")
+
+    last_sync_time = datetime.now(pk_tz).strftime("%Y-%m-%d %H:%M:%S")
+    supabase.table("tblsynclogs").upsert({"last_sync": last_sync_time}).execute()
+    print(f"✅ Sync log updated: {last_sync_time}")
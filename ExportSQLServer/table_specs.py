@@ -0,0 +1,260 @@
+# table_specs.py
+"""Declarative description of every table copied from SQL Server to Supabase.
+
+Each spec names the SQL Server source (aliased as ``t`` in the generated query)
+and the columns to copy. Supabase column names are the lowercase form of the
+source names; dates, decimals and binary values are converted by type (see
+converters.py), so coerce only lists columns that need something else.
+
+The list is in the order the old numbered export scripts ran; depends_on
+carries the header-before-detail ordering that the numbering implied,
+everything else may sync in parallel. Detail tables with a header_key are
+read for exactly the header rows synced in the same run (header_sets.py).
+"""
+from dataclasses import dataclass, field
+
+from converters import money
+
+# Source expression used to detect changed rows; EditDate is NULL until a row is edited.
+CHANGE_COLUMN = "COALESCE(t.EditDate, t.CreatedDate)"
+
+AUDIT_COLUMNS = ("CreatedUser", "CreatedDate", "EditUser", "EditDate")
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    target: str                      # Supabase table
+    source: str                      # SQL Server table
+    columns: tuple                   # source columns, in upload order
+    key: str                         # primary key source column (upsert conflict target)
+    coerce: dict = field(default_factory=dict)   # source column -> converter overriding the type default
+    join: str = ""                   # extra FROM clause, e.g. a header table
+    closing_date_column: str = None  # only rows after MasterClosingDate are synced
+    change_column: str = CHANGE_COLUMN
+    depends_on: tuple = ()           # targets that must finish syncing before this one starts
+    in_default_run: bool = True      # part of a plain `python sync.py` run
+    parallel_read: bool = False      # full reloads read key ranges concurrently (--read-parallelism)
+    diff_sync: bool = False          # send only rows whose content hash changed (row_hashes.py)
+    schedule_minutes: int = 60       # how often sync_service.py syncs the table
+    loader: str = "rest"             # "rest" (PostgREST inserts) or "copy" (see copy_loader.py)
+    header_key: str = None           # column referencing the depends_on header; read together (header_sets.py)
+    propagate_deletes: bool = False  # incremental runs delete rows removed in SQL Server (deletions.py)
+
+    @property
+    def target_key(self):
+        return self.key.lower()
+
+
+TABLE_SPECS = [
+    TableSpec(
+        target="tblusers",
+        source="tblusers",
+        columns=("userid_pk", "username", "password", "currentlyworking", "active",
+                 "createduser", "createddate", "edituser", "editdate"),
+        key="userid_pk",
+        change_column="COALESCE(t.editdate, t.createddate)",
+        in_default_run=False,
+    ),
+    TableSpec(
+        target="tblchartofaccounts1",
+        source="tblChartOfAccounts1",
+        columns=("AccountCodeControl", "AccountNameControl", "AccountType") + AUDIT_COLUMNS,
+        key="AccountCodeControl",
+        diff_sync=True,
+    ),
+    TableSpec(
+        target="tblchartofaccounts2",
+        source="tblChartOfAccounts2",
+        columns=("AccountCodeControl", "AccountCodeSubsidairy", "AccountNameSubsidairy",
+                 "BankAccount", "CashAccount", "IncludeInFinancialStatements") + AUDIT_COLUMNS,
+        key="AccountCodeSubsidairy",
+        depends_on=("tblchartofaccounts1",),
+        diff_sync=True,
+    ),
+    TableSpec(
+        target="tblbanks",
+        source="tblBanks",
+        columns=("BankID_PK", "BankName", "BranchName", "ChequeOwnerID_FK", "Active") + AUDIT_COLUMNS,
+        key="BankID_PK",
+        diff_sync=True,
+    ),
+    TableSpec(
+        target="tblcustomers",
+        source="tblCustomers",
+        columns=("CustomerID_PK", "CustomerName", "ContactPerson", "Designation", "Address",
+                 "Phone", "Fax", "Active", "GSTNumber", "CreditDays", "Phone2")
+                + AUDIT_COLUMNS + ("AdvAccount", "BcAccount"),
+        key="CustomerID_PK",
+        diff_sync=True,
+    ),
+    TableSpec(
+        target="tblsuppliers",
+        source="tblSuppliers",
+        columns=("SupplierID_PK", "SupplierName", "ContactPerson", "Designation", "Address",
+                 "CityCode", "Phone", "Fax", "Active", "GSTNumber") + AUDIT_COLUMNS,
+        key="SupplierID_PK",
+        diff_sync=True,
+    ),
+    TableSpec(
+        target="tblboatstatus",
+        source="tblBoatStatus",
+        columns=("BoatStatusID_PK", "BoatStatus", "Active") + AUDIT_COLUMNS,
+        key="BoatStatusID_PK",
+        diff_sync=True,
+    ),
+    TableSpec(
+        target="tblboats",
+        source="tblBoats",
+        columns=("BoatID_PK", "CustomerID_FK", "BoatName", "Model", "Active", "BoatOwner",
+                 "Beopari", "Nakhuda") + AUDIT_COLUMNS
+                + ("IgnoreActivity", "InactivityReason", "BoatStatusID_FK"),
+        key="BoatID_PK",
+        diff_sync=True,
+    ),
+    TableSpec(
+        target="tblcity",
+        source="tblCity",
+        columns=("IDCity", "CityCode", "CityName", "CountryCode", "Active"),
+        key="IDCity",
+        in_default_run=False,
+    ),
+    TableSpec(
+        target="tblstores",
+        source="tblStores",
+        columns=("StoreID_PK", "StoreName", "Address", "PhoneNumber", "StoreIncharge",
+                 "IncrementPercent", "Active", "StorageCapacity", "IncludeInReport", "Rate",
+                 "Amount") + AUDIT_COLUMNS,
+        key="StoreID_PK",
+        diff_sync=True,
+    ),
+    TableSpec(
+        target="tblitems",
+        source="tblItems",
+        columns=("ItemID_PK", "ItemName", "Price", "Cost", "Inventory", "SalesAccountCode",
+                 "PurchasesAccountCode", "CoGSAccountCode", "Increments")
+                + AUDIT_COLUMNS + ("ShowInBills",),
+        key="ItemID_PK",
+        diff_sync=True,
+    ),
+    TableSpec(
+        target="tblsales",
+        source="tblSales",
+        columns=("SalesID_PK", "SalesDate", "CustomerID_FK", "BoatID_FK", "Active",
+                 "AccountCode1", "AccountCode1Amount", "AccountCode2", "AccountCode2Amount",
+                 "BillPrefixID_FK", "Reference") + AUDIT_COLUMNS + ("PrintBill",),
+        key="SalesID_PK",
+        closing_date_column="t.SalesDate",
+        schedule_minutes=5,
+        propagate_deletes=True,
+    ),
+    # Detail rows carry no dates of their own, so changes are tracked through the header.
+    TableSpec(
+        target="tblsalesdetail",
+        source="tblSalesDetail",
+        columns=("SalesDetailID_PK", "SalesID_FK", "ItemID_FK", "Price", "Quantity", "StoreID_FK"),
+        key="SalesDetailID_PK",
+        coerce={"Price": money},
+        join="INNER JOIN tblSales s ON s.SalesID_PK = t.SalesID_FK",
+        closing_date_column="s.SalesDate",
+        change_column="COALESCE(s.EditDate, s.CreatedDate)",
+        depends_on=("tblsales",),
+        header_key="SalesID_FK",
+        parallel_read=True,
+        schedule_minutes=5,
+        propagate_deletes=True,
+    ),
+    TableSpec(
+        target="tblopeningbalances",
+        source="tblOpeningBalances",
+        columns=("SalesDate", "CustomerID_FK", "SalesID_PK", "CustomerName", "BillTotal",
+                 "SumOfCredit", "Balance", "BoatName", "BoatID_PK") + AUDIT_COLUMNS,
+        key="SalesID_PK",
+        schedule_minutes=5,
+    ),
+    TableSpec(
+        target="tblgeneralledger",
+        source="tblGeneralLedger",
+        columns=("TransactionID_PK", "AccountCode", "Debit", "Credit", "NarrationsGL",
+                 "VoucherNumber", "TransactionDate", "Reference", "PDC", "ChequeNumber",
+                 "ChequeDate", "BankID_FK", "ChequeBounced", "ChequeID_FK",
+                 "ChequeBookDetailID_FK", "MasterBank", "Remarks")
+                + AUDIT_COLUMNS + ("IgnoreInIS", "BoatID_FK"),
+        key="TransactionID_PK",
+        coerce={"Debit": money, "Credit": money},
+        closing_date_column="t.TransactionDate",
+        parallel_read=True,
+        schedule_minutes=5,
+        propagate_deletes=True,
+    ),
+    TableSpec(
+        target="tblcheques",
+        source="tblCheques",
+        columns=("ChequeID_PK", "BankID_FK", "ChequeNumber", "ChequeDate", "VoucherNumber",
+                 "Amount", "Balance", "BounceCounter", "Active",
+                 "ClearedOrAdjustedOrBounced") + AUDIT_COLUMNS,
+        key="ChequeID_PK",
+        schedule_minutes=5,
+        propagate_deletes=True,
+    ),
+    TableSpec(
+        target="tbltransfers",
+        source="tblTransfers",
+        columns=("TransferID_PK", "TransferDate", "StoreID_FK_From", "StoreID_FK_Into",
+                 "Active", "Reference", "CreatedUser", "CreatedDate", "EditUser"),
+        key="TransferID_PK",
+        propagate_deletes=True,
+    ),
+    TableSpec(
+        target="tbltransferdetail",
+        source="tblTransferDetail",
+        columns=("TransferDetailID_PK", "TransferID_FK", "ItemID_FK", "Quantity", "Price",
+                 "IncrementedPercent"),
+        key="TransferDetailID_PK",
+        join="LEFT JOIN tblTransfers h ON h.TransferID_PK = t.TransferID_FK",
+        change_column="COALESCE(h.EditDate, h.CreatedDate)",
+        depends_on=("tbltransfers",),
+        header_key="TransferID_FK",
+        propagate_deletes=True,
+    ),
+    TableSpec(
+        target="tblpurchases",
+        source="tblPurchases",
+        columns=("PurchaseID_PK", "PurchaseDate", "SupplierID_FK", "Active", "Reference")
+                + AUDIT_COLUMNS,
+        key="PurchaseID_PK",
+        propagate_deletes=True,
+    ),
+    TableSpec(
+        target="tblpurchasedetail",
+        source="tblPurchasedetail",
+        columns=("PurchaseDetailID_PK", "PurchaseID_FK", "ItemID_FK", "Quantity", "Cost",
+                 "IncrementedPercent", "StoreID_FK"),
+        key="PurchaseDetailID_PK",
+        coerce={"Cost": money},
+        join="LEFT JOIN tblPurchases h ON h.PurchaseID_PK = t.PurchaseID_FK",
+        change_column="COALESCE(h.EditDate, h.CreatedDate)",
+        depends_on=("tblpurchases",),
+        header_key="PurchaseID_FK",
+        propagate_deletes=True,
+    ),
+    TableSpec(
+        target="tblbillprefix",
+        source="tblBillPrefix",
+        columns=("BillPrefixID_PK", "BillPrefix", "Description") + AUDIT_COLUMNS,
+        key="BillPrefixID_PK",
+        diff_sync=True,
+    ),
+]
+
+SPECS_BY_TARGET = {spec.target: spec for spec in TABLE_SPECS}
+
+
+def select_specs(targets=None):
+    """Specs for the given Supabase table names (all default tables when empty), in run order."""
+    if not targets:
+        return [spec for spec in TABLE_SPECS if spec.in_default_run]
+    unknown = [t for t in targets if t.lower() not in SPECS_BY_TARGET]
+    if unknown:
+        raise ValueError(f"Unknown table(s): {', '.join(unknown)}")
+    wanted = {t.lower() for t in targets}
+    return [spec for spec in TABLE_SPECS if spec.target in wanted]
@@ -0,0 +1,13 @@
+# conftest.py
+"""Make the sync modules importable and keep the tests away from a real run's state and spool."""
+import os
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+SCRATCH_DIR = tempfile.mkdtemp(prefix="sync-tests-")
+os.environ["SYNC_STATE_DIR"] = os.path.join(SCRATCH_DIR, "state")
+os.environ["SYNC_SPOOL_DIR"] = os.path.join(SCRATCH_DIR, "spool")
+os.environ["SYNC_LOG_DIR"] = os.path.join(SCRATCH_DIR, "logs")
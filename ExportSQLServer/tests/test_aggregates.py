@@ -0,0 +1,124 @@
+# test_aggregates.py
+from aggregates import AGGREGATES, Summary, TouchedKeys, needs_rebuild
+
+ACCOUNT_BALANCES = next(aggregate for aggregate in AGGREGATES if aggregate.target == "tblsync_account_balances")
+CUSTOMER_SALES = next(aggregate for aggregate in AGGREGATES if aggregate.target == "tblsync_customer_sales")
+
+
+def ledger(key, account, debit=0, credit=0):
+    return {"transactionid_pk": key, "accountcode": account, "debit": debit, "credit": credit}
+
+
+def summary(tmp_path, aggregate=ACCOUNT_BALANCES, **kwargs):
+    return Summary(aggregate, "transactionid_pk", directory=tmp_path, **kwargs)
+
+
+def totals(tmp_path, aggregate=ACCOUNT_BALANCES):
+    """The stored summary records by group, as push() would send them."""
+    current = summary(tmp_path, aggregate)
+    try:
+        return {tuple(record[field] for field in aggregate.group_by): record for _, record in current.pending()}
+    finally:
+        current.close()
+
+
+def is_dirty(tmp_path):
+    current = summary(tmp_path)
+    current.close()
+    return current.dirty
+
+
+def test_full_reload_builds_the_totals(tmp_path):
+    full = summary(tmp_path, replace=True)
+    full.apply([ledger(1, "A", debit=100), ledger(2, "A", credit=30.5), ledger(3, "B", debit=7), ledger(4, None, 9)])
+    assert full.commit() == 2
+    full.close()
+
+    assert totals(tmp_path) == {
+        ("A",): {"accountcode": "A", "debit": 100.0, "credit": 30.5, "balance": 69.5, "entries": 2},
+        ("B",): {"accountcode": "B", "debit": 7.0, "credit": 0.0, "balance": 7.0, "entries": 1},
+    }
+
+
+def test_changed_row_moves_from_its_old_group_to_its_new_one(tmp_path):
+    full = summary(tmp_path, replace=True)
+    full.apply([ledger(1, "A", debit=100), ledger(2, "A", debit=50)])
+    full.commit()
+    full.close()
+
+    touched = TouchedKeys()
+    incremental = summary(tmp_path, touched=touched)
+    incremental.apply([ledger(2, "B", debit=60)])
+    assert incremental.commit() == 2
+    incremental.close()
+
+    result = totals(tmp_path)
+    assert (result[("A",)]["debit"], result[("A",)]["entries"]) == (100.0, 1)
+    assert (result[("B",)]["debit"], result[("B",)]["entries"]) == (60.0, 1)
+    assert touched.params() == {"account_codes": ["A", "B"], "customer_ids": [], "boat_ids": []}
+
+
+def test_row_that_stops_counting_leaves_its_group(tmp_path):
+    sales = Summary(CUSTOMER_SALES, "salesid_pk", replace=True, directory=tmp_path)
+    sales.apply([{"salesid_pk": 1, "customerid_fk": 5, "active": True, "accountcode1amount": 10,
+                  "accountcode2amount": 2.5}])
+    sales.commit()
+    sales.close()
+
+    sales = Summary(CUSTOMER_SALES, "salesid_pk", directory=tmp_path)
+    sales.apply([{"salesid_pk": 1, "customerid_fk": 5, "active": False, "accountcode1amount": 10}])
+    sales.commit()
+    sales.close()
+
+    assert totals(tmp_path, CUSTOMER_SALES)[(5,)] == {"customerid_fk": 5, "bill_amount": 0.0, "entries": 0}
+
+
+def test_remove_takes_deleted_rows_out_of_the_totals(tmp_path):
+    full = summary(tmp_path, replace=True)
+    full.apply([ledger(1, "A", debit=100), ledger(2, "A", debit=50), ledger(3, "B", credit=5)])
+    full.commit()
+    full.close()
+
+    incremental = summary(tmp_path)
+    incremental.remove([2, 3, 99])
+    assert incremental.commit() == 2
+    incremental.close()
+
+    result = totals(tmp_path)
+    assert (result[("A",)]["debit"], result[("A",)]["entries"]) == (100.0, 1)
+    assert (result[("B",)]["credit"], result[("B",)]["entries"]) == (0.0, 0)
+
+
+def test_uncommitted_contributions_are_rolled_back(tmp_path):
+    full = summary(tmp_path, replace=True)
+    full.apply([ledger(1, "A", debit=100)])
+    full.commit()
+    full.close()
+
+    failed = summary(tmp_path)
+    failed.apply([ledger(1, "A", debit=40)])
+    failed.close()
+
+    retried = summary(tmp_path)
+    retried.apply([ledger(1, "A", debit=40)])
+    retried.commit()
+    retried.close()
+    assert totals(tmp_path)[("A",)]["debit"] == 40.0
+
+
+def test_resumed_run_marks_the_summary_dirty_until_a_full_reload(tmp_path):
+    assert not needs_rebuild("tblgeneralledger", tmp_path)
+    resumed = summary(tmp_path, resumed=True)
+    resumed.apply([ledger(1, "A", debit=1)])
+    resumed.commit()
+    resumed.close()
+    assert is_dirty(tmp_path)
+    assert needs_rebuild("tblgeneralledger", tmp_path)
+    assert not needs_rebuild("tblsales", tmp_path)
+
+    full = summary(tmp_path, replace=True)
+    full.apply([ledger(1, "A", debit=1)])
+    full.commit()
+    full.close()
+    assert not is_dirty(tmp_path)
+    assert not needs_rebuild("tblgeneralledger", tmp_path)
@@ -0,0 +1,85 @@
+# test_checkpoints.py
+from datetime import datetime
+
+from checkpoints import Checkpoint
+
+SINCE = datetime(2024, 1, 1)
+BOUNDARY = datetime(2024, 1, 2, 6)
+
+
+def records(*keys):
+    return [{"id": key} for key in keys]
+
+
+def run_through(checkpoint, chunks, batch_sizes):
+    """Feed chunks and batches of batch_sizes rows through the checkpoint like sync_table does."""
+    chunks = list(checkpoint.track_chunks((chunk, datetime(2024, 1, 1, hour)) for hour, chunk in chunks))
+    rows = [(row, newest) for chunk, newest in chunks for row in chunk]
+    batches, start = [], 0
+    for number, size in enumerate(batch_sizes, 1):
+        batch = rows[start:start + size]
+        batches.append((number, [row for row, _ in batch], max(newest for _, newest in batch)))
+        start += size
+    return list(checkpoint.track_batches(batches))
+
+
+def make_checkpoint(tmp_path, ranges=((None, 10), (10, None))):
+    return Checkpoint("tblsales", "id", "full", None, "tblsales_staging", ranges, directory=tmp_path,
+                      boundary=BOUNDARY)
+
+
+def test_ack_moves_only_past_gapless_batches(tmp_path):
+    checkpoint = make_checkpoint(tmp_path)
+    run_through(checkpoint, [(1, records(1, 2)), (2, records(3, 4)), (3, records(11, 12))], [2, 2, 2])
+
+    checkpoint.ack(2)
+    assert checkpoint.batch == 0
+    assert checkpoint.ranges == [[None, 10], [10, None]]
+
+    checkpoint.ack(1)
+    assert checkpoint.batch == 2
+    assert checkpoint.rows == 4
+    assert checkpoint.ranges == [[4, 10], [10, None]]
+
+    checkpoint.ack(3)
+    assert checkpoint.batch == 3
+    assert checkpoint.ranges == [[4, 10], [12, None]]
+
+
+def test_range_moves_only_once_a_whole_chunk_is_acknowledged(tmp_path):
+    checkpoint = make_checkpoint(tmp_path)
+    # Batch 1 ends in the middle of the chunk of keys 3-6.
+    run_through(checkpoint, [(1, records(1, 2)), (2, records(3, 4, 5, 6))], [3, 3])
+
+    checkpoint.ack(1)
+    assert checkpoint.ranges[0] == [2, 10]
+    checkpoint.ack(2)
+    assert checkpoint.ranges[0] == [6, 10]
+
+
+def test_load_restores_the_saved_progress(tmp_path):
+    checkpoint = make_checkpoint(tmp_path)
+    run_through(checkpoint, [(5, records(1, 2)), (7, records(11))], [2, 1])
+    checkpoint.ack(1)
+
+    loaded = Checkpoint.load("tblsales", "id", directory=tmp_path)
+    assert (loaded.mode, loaded.load_into, loaded.batch, loaded.rows) == ("full", "tblsales_staging", 1, 2)
+    assert loaded.ranges == [[2, 10], [10, None]]
+    assert loaded.newest == datetime(2024, 1, 1, 5)
+    assert loaded.boundary == BOUNDARY
+    assert loaded.since is None
+
+
+def test_open_ranges_leaves_out_finished_ranges(tmp_path):
+    checkpoint = make_checkpoint(tmp_path, ranges=((10, 10), (10, 20), (20, None)))
+    assert checkpoint.open_ranges == [(10, 20), (20, None)]
+
+
+def test_clear_forgets_the_checkpoint(tmp_path):
+    checkpoint = make_checkpoint(tmp_path)
+    run_through(checkpoint, [(1, records(1))], [1])
+    checkpoint.ack(1)
+    assert Checkpoint.load("tblsales", "id", directory=tmp_path) is not None
+
+    checkpoint.clear()
+    assert Checkpoint.load("tblsales", "id", directory=tmp_path) is None
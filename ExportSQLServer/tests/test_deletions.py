@@ -0,0 +1,67 @@
+# test_deletions.py
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from deletions import DeleteCheck
+
+SPEC = SimpleNamespace(target="tblgeneralledger", target_key="transactionid_pk", source="tblGeneralLedger",
+                       key="TransactionID_PK")
+
+
+class FakePool:
+    """SQL Server without change tracking on the table and keys 1 to 10."""
+
+    def __init__(self):
+        self.queries = []
+
+    @contextmanager
+    def connection(self):
+        yield self
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, *params):
+        self.queries.append(sql)
+        if "CHANGE_TRACKING" in sql:
+            self.rows = [(100, None)]
+        elif "MIN(" in sql:
+            self.rows = [(1, 10)]
+        else:
+            self.rows = []
+        return self
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class RefusingSupabase:
+    def rpc(self, name, params):
+        raise RuntimeError(f"permission denied for function {name}")
+
+
+def check(tmp_path, pool):
+    deletes = DeleteCheck(SPEC, pool, RefusingSupabase(), None, lambda *bounds: ("FROM tblGeneralLedger t", ()),
+                          path=str(tmp_path / "deletions.json"))
+    deletes.start()
+    return deletes
+
+
+def test_failed_key_comparison_backs_off_without_aggregating_sql_server(tmp_path):
+    pool = FakePool()
+    deletes = check(tmp_path, pool)
+    assert deletes.due
+    with pytest.raises(RuntimeError):
+        deletes.run()
+    assert not any("GROUP BY" in sql for sql in pool.queries)
+
+    pool.queries.clear()
+    retry = check(tmp_path, pool)
+    assert not retry.due
+    assert retry.run() == []
+    assert not any("MIN(" in sql for sql in pool.queries)
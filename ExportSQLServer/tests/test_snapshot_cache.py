@@ -0,0 +1,37 @@
+# test_snapshot_cache.py
+from datetime import datetime
+
+import snapshot_cache
+from snapshot_cache import SnapshotCache
+
+BOUNDARY = datetime(2026, 3, 1, 12, 0)
+
+
+def half_uploaded(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot_cache, "CACHE_FORMAT", "jsonl")
+    snapshot = SnapshotCache("tblsales", root=tmp_path)
+    snapshot.start("incremental", datetime(2026, 3, 1), "tblsales", True, BOUNDARY)
+    list(snapshot.stage(iter([(['{"salesid_pk": 1}'], None), (['{"salesid_pk": 2}'], None)])))
+    snapshot.ack(1)
+    return SnapshotCache("tblsales", root=tmp_path)
+
+
+def test_snapshot_is_superseded_once_the_high_water_mark_passes_its_boundary(tmp_path, monkeypatch):
+    snapshot = half_uploaded(tmp_path, monkeypatch)
+    assert snapshot.resumable
+    assert [entry["batch"] for entry in snapshot.pending()] == [2]
+    assert not snapshot.superseded(None)
+    assert not snapshot.superseded(BOUNDARY)
+    assert snapshot.superseded(datetime(2026, 3, 1, 12, 5))
+
+
+def test_discard_drops_a_half_uploaded_snapshot_but_keeps_an_uploaded_one(tmp_path, monkeypatch):
+    snapshot = half_uploaded(tmp_path, monkeypatch)
+    snapshot.discard()
+    assert not SnapshotCache("tblsales", root=tmp_path).resumable
+
+    snapshot = half_uploaded(tmp_path, monkeypatch)
+    snapshot.ack(2)
+    snapshot.finish()
+    snapshot.discard()
+    assert SnapshotCache("tblsales", root=tmp_path).extracted
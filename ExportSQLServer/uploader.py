@@ -0,0 +1,278 @@
+# uploader.py
+"""Concurrent, self-pacing batch uploads to the Supabase REST API.
+
+Several batches of one table are in flight at once over a shared keep-alive
+session. Instead of sleeping a fixed time after every batch, an AdaptivePacer
+widens the number of concurrent requests while responses come back quickly and
+halves it (with a cool-down) when Supabase answers 429 or 5xx.
+
+Transient failures are retried with jittered exponential backoff. A batch
+rejected for its data is bisected until the offending rows are isolated; only
+those rows, or a batch that still fails after every retry, go to the local
+dead-letter spool (dead_letter.py) for the next run to replay. Bisection stops
+when both halves fail with the same error (every row shares the problem, e.g.
+a missing column) or after MAX_BISECT_DEPTH splits, and spools what is left.
+
+Request bodies are JSON by default; payloads.py can send CSV and gzip instead.
+"""
+import json
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from batching import TARGET_LATENCY_SECONDS, BatchSizer
+from dead_letter import spool_rows
+from payloads import encode_payload, json_size, payload_options
+
+DEFAULT_UPLOAD_CONCURRENCY = 4
+MAX_RETRIES = 5                    # resends of a batch after 429/5xx or a dropped connection
+MAX_COOL_DOWN_SECONDS = 30.0
+DATA_ERROR_STATUSES = {400, 409, 422}   # the payload itself was refused; worth bisecting
+MAX_BISECT_DEPTH = 6               # splits of a refused batch before the rest is spooled whole
+DELETE_CHUNK = 500                 # keys per DELETE request (they go in the query string)
+
+UploadResult = namedtuple("UploadResult", "rows_uploaded rows_spooled rows_lost newest_change")
+
+
+class UploadError(Exception):
+    def __init__(self, status, message):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+
+
+def is_throttled(status):
+    return status in (408, 429) or status >= 500
+
+
+class AdaptivePacer:
+    """AIMD limit on in-flight requests plus a shared cool-down after throttling."""
+
+    def __init__(self, max_concurrency, target_latency=TARGET_LATENCY_SECONDS):
+        self.max_concurrency = max(1, max_concurrency)
+        self.target_latency = target_latency
+        self.limit = max(1, self.max_concurrency // 2)
+        self.in_flight = 0
+        self.cool_down = 0.0
+        self.resume_at = 0.0
+        self.cond = threading.Condition()
+
+    def acquire(self):
+        with self.cond:
+            while True:
+                wait = self.resume_at - time.monotonic()
+                if wait <= 0 and self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+                self.cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(self, latency=None, throttled=False, retry_after=None):
+        with self.cond:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(1, self.limit // 2)
+                self.cool_down = min(max(self.cool_down * 2, 0.5), MAX_COOL_DOWN_SECONDS)
+                delay = retry_after or self.cool_down * random.uniform(0.5, 1.5)
+                self.resume_at = max(self.resume_at, time.monotonic() + delay)
+            elif latency is not None:
+                if latency > self.target_latency:
+                    self.limit = max(1, self.limit - 1)
+                elif self.limit < self.max_concurrency:
+                    self.limit += 1
+                self.cool_down /= 2
+            self.cond.notify_all()
+
+
+def post_rows(session, table_name, body, on_conflict=None, content_headers=None):
+    """POST a body of rows (JSON unless content_headers say otherwise); on_conflict makes it an upsert."""
+    headers = {"Prefer": "return=minimal", **(content_headers or {})}
+    params = {}
+    if on_conflict:
+        headers["Prefer"] += ",resolution=merge-duplicates"
+        params["on_conflict"] = on_conflict
+    return session.post(f"/{table_name}", content=body, params=params, headers=headers)
+
+
+def delete_keys(session, table_name, key, values, chunk_size=DELETE_CHUNK):
+    """DELETE rows whose key is in values, chunk_size keys per request; returns the number of keys sent."""
+    values = list(values)
+    for i in range(0, len(values), chunk_size):
+        quoted = ",".join(json.dumps(value) if isinstance(value, str) else str(value)
+                          for value in values[i:i + chunk_size])
+        response = session.delete(f"/{table_name}", params={key: f"in.({quoted})"},
+                                  headers={"Prefer": "return=minimal"})
+        if response.is_error:
+            raise UploadError(response.status_code, response.text[:500])
+    return len(values)
+
+
+def retry_after_seconds(response):
+    try:
+        return float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+
+class BatchUploader:
+    """Upload the batches of one table concurrently; call finish() for the totals."""
+
+    def __init__(self, session, table_name, on_conflict=None, concurrency=DEFAULT_UPLOAD_CONCURRENCY,
+                 sizer=None, load_into=None, metrics=None, on_batch_done=None, payload_format=None,
+                 encoding=None):
+        self.session = session
+        # See payloads.py; None = SYNC_PAYLOAD_FORMAT / SYNC_PAYLOAD_ENCODING. Checked here, not per batch.
+        self.payload_format, self.encoding = payload_options(payload_format, encoding)
+        self.metrics = metrics                      # metrics.TableMetrics, optional
+        self.on_batch_done = on_batch_done          # called with the batch number once no row of it is lost
+        self.load_into = load_into or table_name   # e.g. the staging copy of table_name
+        self.sizer = sizer or BatchSizer()
+        self.table_name = table_name
+        self.on_conflict = on_conflict
+        self.pacer = AdaptivePacer(concurrency)
+        self.pool = ThreadPoolExecutor(max_workers=max(1, concurrency),
+                                       thread_name_prefix=f"upload-{table_name}")
+        # Batches queued or in flight; submit() blocks beyond this so memory stays bounded.
+        self.slots = threading.BoundedSemaphore(max(1, concurrency) * 2)
+        self.lock = threading.Lock()
+        self.rows_uploaded = 0
+        self.rows_spooled = 0
+        self.rows_lost = 0
+        self.newest_change = None
+        self.started = time.time()
+
+    def submit(self, batch_number, parts, newest_change=None):
+        """Queue one batch of JSON-encoded rows (see batching.byte_batches)."""
+        self.slots.acquire()
+        future = self.pool.submit(self._upload, batch_number, parts, newest_change)
+        future.add_done_callback(lambda _: self.slots.release())
+
+    def _record(self, **amounts):
+        if self.metrics:
+            self.metrics.add(**amounts)
+
+    def _send(self, body, content_headers):
+        for attempt in range(MAX_RETRIES + 1):
+            self.pacer.acquire()
+            start = time.monotonic()
+            try:
+                response = post_rows(self.session, self.load_into, body, self.on_conflict, content_headers)
+            except httpx.TransportError as e:
+                self.pacer.release(throttled=True)
+                self._record(requests=1, retries=int(attempt > 0), upload_seconds=time.monotonic() - start)
+                if attempt == MAX_RETRIES:
+                    raise UploadError(0, str(e))
+                continue
+
+            self._record(requests=1, retries=int(attempt > 0), upload_seconds=time.monotonic() - start,
+                         throttled=int(is_throttled(response.status_code)))
+            if is_throttled(response.status_code) and attempt < MAX_RETRIES:
+                self.pacer.release(throttled=True, retry_after=retry_after_seconds(response))
+                print(f"⏳ {self.table_name}: HTTP {response.status_code}, backing off "
+                      f"(limit {self.pacer.limit} in flight)")
+                continue
+            self.pacer.release(latency=time.monotonic() - start)
+            if response.is_error:
+                raise UploadError(response.status_code, response.text[:500])
+            self._record(bytes_sent=len(body))
+            return time.monotonic() - start
+
+    def _send_parts(self, parts):
+        """Send encoded rows; a payload refused as too large is split in half and resent.
+
+        Batches are sized by their plain JSON size whatever the body format, and
+        json_bytes records that size so bytes_sent can be compared against it.
+        """
+        body, content_headers = encode_payload(parts, self.payload_format, self.encoding)
+        nbytes = json_size(parts)
+        try:
+            latency = self._send(body, content_headers)
+        except UploadError as e:
+            if e.status != 413 or len(parts) < 2:
+                raise
+            self.sizer.rejected(nbytes)
+            print(f"✂️ {self.table_name}: {len(body) // 1024} KB payload too large, "
+                  f"batch target now {self.sizer.target_bytes // 1024} KB")
+            half = len(parts) // 2
+            return self._send_parts(parts[:half]) + self._send_parts(parts[half:])
+        self._record(json_bytes=nbytes)
+        self.sizer.record(nbytes, latency)
+        return latency
+
+    def _attempt(self, parts):
+        """Send rows; returns the UploadError they were refused with, or None."""
+        try:
+            self._send_parts(parts)
+        except UploadError as e:
+            return e
+        return None
+
+    def _deliver(self, parts):
+        """Send rows, bisecting on data errors; returns (sent, lost). The rest is spooled."""
+        error = self._attempt(parts)
+        return (len(parts), 0) if error is None else self._bisect(parts, error)
+
+    def _bisect(self, parts, error, depth=0):
+        """Send what can be sent of rows refused with error; returns (sent, lost). The rest is spooled."""
+        if error.status in DATA_ERROR_STATUSES and len(parts) > 1 and depth < MAX_BISECT_DEPTH:
+            half = len(parts) // 2
+            halves = [(parts[:half], self._attempt(parts[:half])), (parts[half:], self._attempt(parts[half:]))]
+            first_error, second_error = (half_error for _, half_error in halves)
+            if first_error is None or second_error is None or str(first_error) != str(second_error):
+                sent = lost = 0
+                for half_parts, half_error in halves:
+                    if half_error is None:
+                        sent += len(half_parts)
+                    else:
+                        half_sent, half_lost = self._bisect(half_parts, half_error, depth + 1)
+                        sent, lost = sent + half_sent, lost + half_lost
+                return sent, lost
+            # Both halves refused alike: every row shares the problem, splitting further only costs requests.
+
+        try:
+            spool_rows(self.table_name, parts, error)
+            print(f"📥 {self.table_name}: {len(parts)} row(s) spooled for the next run: {error}")
+            with self.lock:
+                self.rows_spooled += len(parts)
+        except Exception as e:
+            print(f"❌ {self.table_name}: could not spool {len(parts)} row(s), they are lost: {e}")
+            with self.lock:
+                self.rows_lost += len(parts)
+            return 0, len(parts)
+        return 0, 0
+
+    def _upload(self, batch_number, parts, newest_change):
+        start = time.monotonic()
+        try:
+            sent, lost = self._deliver(parts)
+        except Exception as e:
+            # Nothing waits on the worker's future, so an unexpected error must show up in the totals:
+            # lost rows hold the high-water mark back and keep a staging table from being swapped in.
+            print(f"❌ {self.table_name}: batch {batch_number} failed, {len(parts)} row(s) lost: {e!r}")
+            sent, lost = 0, len(parts)
+            with self.lock:
+                self.rows_lost += lost
+        if self.on_batch_done and not lost:
+            try:
+                self.on_batch_done(batch_number)
+            except Exception as e:
+                # The rows are in Supabase; only the progress record missed them, so a resume resends them.
+                print(f"⚠️ {self.table_name}: batch {batch_number} sent but not recorded as done: {e!r}")
+        with self.lock:
+            self.rows_uploaded += sent
+            if newest_change and (self.newest_change is None or newest_change > self.newest_change):
+                self.newest_change = newest_change
+            total = self.rows_uploaded
+        if self.metrics:
+            nbytes = json_size(parts)
+            self.metrics.batch(batch_number, len(parts), sent, nbytes, time.monotonic() - start)
+        icon = "✅" if sent == len(parts) else "⚠️"
+        print(f"{icon} {self.table_name}: batch {batch_number} ({sent}/{len(parts)} records) "
+              f"in {time.monotonic() - start:.2f}s | Total: {total} in {time.time() - self.started:.2f}s")
+
+    def finish(self):
+        """Wait for every submitted batch and return the UploadResult."""
+        self.pool.shutdown(wait=True)
+        return UploadResult(self.rows_uploaded, self.rows_spooled, self.rows_lost, self.newest_change)